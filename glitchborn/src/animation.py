@@ -0,0 +1,122 @@
+"""
+Sprite animation.
+
+A FrameTable holds everything about how one kind of sprite can look, built
+once and shared by every sprite of that kind: a list of frames per state
+("idle", "walk", ...), each already flipped for facing left, and the pixel
+mask of every frame for precise collision. An Animation is the per-sprite
+part, the state it is in and where it is in that state's frames.
+"""
+import pygame
+from assets import asset_manager
+
+# --- Constants ---
+FRAME_MS = 100 # Default time each frame of a looping state is shown
+_tables = {} # Shared frame tables by name
+
+class FrameTable:
+    """
+    Frames and masks for each animation state, for both facings. All frames
+    in a table are the same size, so switching frames never moves a
+    sprite's rect.
+    """
+    def __init__(self, states, frame_ms=FRAME_MS, flipped_states=None):
+        """
+        Initialize the table from a dict of state name -> list of frames
+        facing right, and optionally the same for the frames facing left;
+        without those the right-facing frames are flipped. The masks of
+        every frame are made here.
+        """
+        self.frame_ms = frame_ms
+        self.size = None
+        # (state, facing_right) -> tuple of frames, and likewise for masks
+        self.frames = {}
+        self.masks = {}
+        for state, frames in states.items():
+            if not frames:
+                raise ValueError(f"state {state!r} has no frames")
+            for frame in frames:
+                if self.size is None:
+                    self.size = frame.get_size()
+                elif frame.get_size() != self.size:
+                    raise ValueError(f"frame of {state!r} is {frame.get_size()}, not {self.size}")
+            if flipped_states is not None:
+                flipped = flipped_states[state]
+            else:
+                flipped = [pygame.transform.flip(frame, True, False) for frame in frames]
+            for facing_right, facing_frames in ((True, frames), (False, flipped)):
+                self.frames[state, facing_right] = tuple(facing_frames)
+                self.masks[state, facing_right] = tuple(pygame.mask.from_surface(frame) for frame in facing_frames)
+
+    @classmethod
+    def from_assets(cls, states, colorkey=None, frame_ms=FRAME_MS):
+        """
+        Build a table from a dict of state name -> list of asset file names.
+        The frames and their flipped variants come from the asset manager,
+        so frames packed into an atlas stay in it.
+        """
+        return cls({state: [asset_manager.image(name, colorkey) for name in names] for state, names in states.items()},
+                   frame_ms,
+                   {state: [asset_manager.image(name, colorkey, flipped=True) for name in names]
+                    for state, names in states.items()})
+
+    @classmethod
+    def from_sheet(cls, name, frame_size, states, colorkey=None, frame_ms=FRAME_MS):
+        """
+        Build a table from one sprite sheet: frame_size is the (width,
+        height) of a cell, and states maps each state name to the indices
+        of its cells, counted left to right, top to bottom.
+        """
+        cells = slice_sheet(asset_manager.image(name, colorkey), frame_size)
+        return cls({state: [cells[index] for index in indices] for state, indices in states.items()}, frame_ms)
+
+def slice_sheet(sheet, frame_size):
+    """
+    Cut a sprite sheet into frame_size cells, left to right, top to bottom.
+    The cells are subsurfaces, so they share the sheet's pixels.
+    """
+    width, height = frame_size
+    return [sheet.subsurface((x, y, width, height))
+            for y in range(0, sheet.get_height() - height + 1, height)
+            for x in range(0, sheet.get_width() - width + 1, width)]
+
+def shared_table(name, build):
+    """
+    Return the frame table called name, calling build() to make it the
+    first time it is asked for.
+    """
+    table = _tables.get(name)
+    if table is None:
+        table = _tables[name] = build()
+    return table
+
+class Animation:
+    """
+    Where one sprite is in its frame table. States with a single frame show
+    it straight away; looping states advance one frame every frame_ms of
+    simulated time.
+    """
+    def __init__(self, table, state='idle', facing_right=True):
+        """
+        Initialize the animation on the first frame of state.
+        """
+        self.table = table
+        self.frame_index = 0
+        self.last_update = 0
+        self.image = table.frames[state, facing_right][0]
+        self.mask = table.masks[state, facing_right][0]
+
+    def update(self, now, state, facing_right):
+        """
+        Show the frame for state and facing at simulated time now.
+        """
+        key = (state, facing_right)
+        frames = self.table.frames[key]
+        if len(frames) == 1:
+            self.image = frames[0]
+            self.mask = self.table.masks[key][0]
+        elif now - self.last_update > self.table.frame_ms:
+            self.last_update = now
+            self.frame_index = (self.frame_index + 1) % len(frames)
+            self.image = frames[self.frame_index]
+            self.mask = self.table.masks[key][self.frame_index]
@@ -0,0 +1,377 @@
+import os
+import struct
+import threading
+import pygame
+from collections import OrderedDict
+
+# --- Constants ---
+SURFACE_CACHE_SIZE = 256 # Most distinct surfaces kept alive at once
+# Assets live next to the source tree, not relative to the working directory
+ASSET_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'assets'))
+ATLAS_WIDTH = 1024 # Width of a packed texture atlas
+ATLAS_MAX_FRAME = 256 # Images larger than this in either dimension are not packed
+ATLAS_PADDING = 1 # Gap between packed frames, so frames never bleed into each other
+TEXT_CACHE_SIZE = 256 # Most rendered text surfaces kept alive at once
+# Pixels this close to an image's colorkey (per channel) are see-through too;
+# exported art rarely keeps its background exactly one color
+COLORKEY_TOLERANCE = 16
+# Decoded pixels of every asset are kept here, so later runs skip decoding
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                         'glitchborn')
+# magic, source mtime (ns) and size, width, height, whether it has alpha
+CACHE_HEADER = struct.Struct("<4sqqII?")
+CACHE_MAGIC = b"GBIC"
+
+class SurfaceCache:
+    """
+    A least-recently-used cache of generated surfaces. Sprites that look the
+    same (same size, color or tile image) share one surface instead of each
+    allocating and drawing their own. Cached surfaces must be treated as
+    read-only by the sprites that use them.
+    """
+    def __init__(self, max_size=SURFACE_CACHE_SIZE):
+        """
+        Initialize an empty cache.
+        """
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """
+        Return the surface stored under key, calling build() to create it
+        the first time.
+        """
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = build()
+        # Convert to the display format once, so every blit of it is fast
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+        self.surfaces[key] = surface
+        while len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """
+        Drop every cached surface.
+        """
+        self.surfaces.clear()
+
+    def __len__(self):
+        """
+        The number of cached surfaces.
+        """
+        return len(self.surfaces)
+
+# Shared by every sprite in the game
+surface_cache = SurfaceCache()
+
+def solid_surface(size, color):
+    """
+    Return a shared surface of the given size filled with color.
+    """
+    def build():
+        surface = pygame.Surface(size)
+        surface.fill(color)
+        return surface
+    return surface_cache.get(('solid', tuple(size), tuple(color)), build)
+
+def tiled_surface(size, tile_image):
+    """
+    Return a shared surface of the given size covered with tile_image.
+    """
+    def build():
+        surface = pygame.Surface(size)
+        tile_w, tile_h = tile_image.get_size()
+        surface.blits([(tile_image, (x, y))
+                       for x in range(0, int(size[0]), tile_w)
+                       for y in range(0, int(size[1]), tile_h)], False)
+        return surface
+    # The tile surface itself is part of the key, so it stays alive as long
+    # as anything built from it is cached
+    return surface_cache.get(('tiled', tuple(size), tile_image), build)
+
+def key_out(surface, colorkey, tolerance=COLORKEY_TOLERANCE):
+    """
+    Set every pixel of surface within tolerance of colorkey to exactly
+    colorkey, in place, so set_colorkey() hides all of them.
+    """
+    near = pygame.mask.from_threshold(surface, colorkey, (tolerance, tolerance, tolerance, 255))
+    near.to_surface(surface, setcolor=colorkey, unsetcolor=None)
+
+class TextCache:
+    """
+    Caches fonts by size and rendered text by (text, size, color), so text
+    that doesn't change between frames is rendered once instead of every
+    frame. Rendered surfaces are evicted least-recently-used first.
+    """
+    def __init__(self, font_name=None, max_size=TEXT_CACHE_SIZE):
+        """
+        Initialize the cache for one font file (None is pygame's default font).
+        """
+        self.font_name = font_name
+        self.max_size = max_size
+        self.fonts = {}
+        self.rendered = OrderedDict()
+
+    def font(self, size):
+        """
+        Return the shared font object for a size.
+        """
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(self.font_name, size)
+        return font
+
+    def render(self, text, size, color):
+        """
+        Return an antialiased surface of text, rendering it only the first time.
+        """
+        key = (text, size, tuple(color))
+        surface = self.rendered.get(key)
+        if surface is not None:
+            self.rendered.move_to_end(key)
+            return surface
+        surface = self.font(size).render(text, True, color)
+        self.rendered[key] = surface
+        while len(self.rendered) > self.max_size:
+            self.rendered.popitem(last=False)
+        return surface
+
+class AssetManager:
+    """
+    Loads every image once and hands out shared surfaces. Files are resolved
+    relative to the package, decoded once (optionally on a background thread
+    while a loading screen is shown), converted once the display exists, and
+    memoized together with their flipped variants. Small frames can be
+    packed into a single atlas surface. Decoded pixels are also cached on
+    disk, keyed by the file's modification time and size, so only the
+    first run after an asset changes pays for decoding it.
+    """
+    def __init__(self, asset_dir=ASSET_DIR, cache_dir=CACHE_DIR):
+        """
+        Initialize the manager. Nothing is loaded until it is asked for.
+        cache_dir=None turns the on-disk cache off.
+        """
+        self.asset_dir = asset_dir
+        self.cache_dir = cache_dir
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Decoded but unconverted images by file name; None if the file is missing
+        self.raw = {}
+        # Finished surfaces by (name, colorkey, flipped)
+        self.images = {}
+        self.atlases = []
+        self._lock = threading.Lock()
+        self._loader = None
+        self._pending = 0
+        self._total = 0
+
+    def path(self, name):
+        """
+        Return the full path of an asset file.
+        """
+        return os.path.join(self.asset_dir, name)
+
+    def _cache_path(self, name):
+        """
+        Return where the decoded pixels of an asset file are cached.
+        """
+        return os.path.join(self.cache_dir, name + ".pixels")
+
+    def _load_cached(self, name, stat):
+        """
+        Return the cached pixels of a file as a surface, or None if they
+        are missing or were cached from a different version of the file.
+        """
+        try:
+            with open(self._cache_path(name), 'rb') as f:
+                header = f.read(CACHE_HEADER.size)
+                if len(header) != CACHE_HEADER.size:
+                    return None
+                magic, mtime, size, width, height, alpha = CACHE_HEADER.unpack(header)
+                if magic != CACHE_MAGIC or mtime != stat.st_mtime_ns or size != stat.st_size:
+                    return None
+                return pygame.image.frombytes(f.read(), (width, height), 'RGBA' if alpha else 'RGB')
+        except (OSError, ValueError, pygame.error):
+            return None
+
+    def _store_cached(self, name, stat, surface):
+        """
+        Cache the decoded pixels of a file. The cache is only an
+        optimization, so failing to write it is not an error.
+        """
+        alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+        path = self._cache_path(name)
+        # Per process, since batch workers may all fill the cache at once
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, stat.st_mtime_ns, stat.st_size, surface.get_width(),
+                                          surface.get_height(), alpha))
+                f.write(pygame.image.tobytes(surface, 'RGBA' if alpha else 'RGB'))
+            os.replace(temp_path, path)
+        except OSError:
+            pass
+
+    def _decode(self, name):
+        """
+        Decode a file into self.raw, remembering files that are missing.
+        """
+        try:
+            stat = os.stat(self.path(name))
+        except OSError:
+            stat = None
+        surface = None
+        if stat is not None:
+            if self.cache_dir is not None:
+                surface = self._load_cached(name, stat)
+            if surface is not None:
+                self.cache_hits += 1
+            else:
+                try:
+                    surface = pygame.image.load(self.path(name))
+                except (pygame.error, FileNotFoundError):
+                    surface = None
+                if surface is not None and self.cache_dir is not None:
+                    self.cache_misses += 1
+                    self._store_cached(name, stat, surface)
+        with self._lock:
+            self.raw[name] = surface
+            self._pending -= 1
+
+    def preload(self, names, background=False):
+        """
+        Decode a list of asset files. With background=True the work happens
+        on a worker thread; poll progress or call wait() before using them.
+        """
+        names = [name for name in names if name not in self.raw]
+        with self._lock:
+            self._pending += len(names)
+            self._total += len(names)
+        if not background:
+            for name in names:
+                self._decode(name)
+            return
+
+        def work():
+            for name in names:
+                self._decode(name)
+        self._loader = threading.Thread(target=work, name="asset-preload", daemon=True)
+        self._loader.start()
+
+    @property
+    def progress(self):
+        """
+        Fraction of requested preloads that have finished, from 0.0 to 1.0.
+        """
+        with self._lock:
+            if self._total == 0:
+                return 1.0
+            return (self._total - self._pending) / self._total
+
+    def wait(self):
+        """
+        Block until any background preload has finished.
+        """
+        if self._loader is not None:
+            self._loader.join()
+            self._loader = None
+
+    def _raw(self, name):
+        """
+        Return the decoded surface for a file, loading it now if needed.
+        """
+        if name not in self.raw:
+            with self._lock:
+                self._pending += 1
+                self._total += 1
+            self._decode(name)
+        return self.raw[name]
+
+    def image(self, name, colorkey=None, flipped=False, fallback=None):
+        """
+        Return the shared surface for an asset file. fallback is an optional
+        (size, color) placeholder used when the file does not exist;
+        without one a missing file raises FileNotFoundError.
+        """
+        key = (name, colorkey, flipped)
+        surface = self.images.get(key)
+        if surface is not None:
+            return surface
+
+        if flipped:
+            surface = pygame.transform.flip(self.image(name, colorkey, False, fallback), True, False)
+        else:
+            raw = self._raw(name)
+            if raw is None:
+                if fallback is None:
+                    raise FileNotFoundError(self.path(name))
+                size, color = fallback
+                surface = pygame.Surface(size)
+                surface.fill(color)
+            else:
+                surface = raw.convert() if pygame.display.get_surface() is not None else raw.copy()
+            if colorkey is not None:
+                key_out(surface, colorkey)
+                surface.set_colorkey(colorkey)
+        self.images[key] = surface
+        return surface
+
+    def pack_atlas(self, names, colorkey=None, flipped=True):
+        """
+        Pack small images (and, by default, their flipped variants) into one
+        atlas surface. Later image() calls for them return subsurfaces of the
+        atlas. Images that are missing or too large are left unpacked.
+        """
+        entries = []
+        for name in names:
+            raw = self._raw(name)
+            if raw is None or raw.get_width() > ATLAS_MAX_FRAME or raw.get_height() > ATLAS_MAX_FRAME:
+                continue
+            if colorkey is not None:
+                raw = raw.copy()
+                key_out(raw, colorkey)
+            entries.append(((name, colorkey, False), raw))
+            if flipped:
+                entries.append(((name, colorkey, True), pygame.transform.flip(raw, True, False)))
+        if not entries:
+            return None
+
+        # Shelf packing: tallest frames first, left to right, new row when full
+        entries.sort(key=lambda entry: entry[1].get_height(), reverse=True)
+        placements = []
+        x = y = shelf_height = 0
+        for key, surface in entries:
+            width, height = surface.get_size()
+            if x + width > ATLAS_WIDTH:
+                x = 0
+                y += shelf_height + ATLAS_PADDING
+                shelf_height = 0
+            placements.append((key, surface, pygame.Rect(x, y, width, height)))
+            x += width + ATLAS_PADDING
+            shelf_height = max(shelf_height, height)
+
+        atlas = pygame.Surface((ATLAS_WIDTH, y + shelf_height))
+        atlas.blits([(surface, rect) for _, surface, rect in placements], False)
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert()
+        for key, _, rect in placements:
+            frame = atlas.subsurface(rect)
+            if colorkey is not None:
+                frame.set_colorkey(colorkey)
+            self.images[key] = frame
+        self.atlases.append(atlas)
+        return atlas
+
+# Shared by every sprite and level in the game
+asset_manager = AssetManager()
@@ -0,0 +1,257 @@
+"""
+Batch playtesting for Glitchborn.
+
+Runs many independent headless games across a process pool, each on its own
+seeded level and driven by an automated policy, and prints a report of how
+far they got. Use it to evaluate level generation over thousands of seeds:
+
+    python glitchborn/src/batch.py [--runs N] [--ticks N] [--policy runner,random] [--workers N] [--csv results.csv]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import csv
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+import pygame
+from controls import InputState
+from player import PLAYER_SPEED
+
+# --- Constants ---
+DEFAULT_RUNS = 100
+DEFAULT_TICKS = 3600 # One minute of play at 60 ticks per second
+DEFAULT_SEED = 0
+DEFAULT_POLICIES = "runner,random"
+FALL_DEPTH = 1200 # A player this far below the screen has fallen out of the level
+WORST_SEEDS = 5 # Shortest runs listed in the report, to look at by hand
+
+class RandomPolicy:
+    """
+    Mashes buttons: holds a random direction for a random while, and jumps
+    and attacks at random.
+    """
+    def __init__(self, seed):
+        """
+        Initialize the policy with its own random stream.
+        """
+        self.rng = random.Random(seed)
+        self.direction = None
+        self.hold = 0
+
+    def bind(self, game):
+        """
+        Random play doesn't look at the game.
+        """
+
+    def handle_event(self, event):
+        """
+        Policies ignore the keyboard.
+        """
+
+    def queue_stat(self, stat):
+        """
+        Policies ignore clicks.
+        """
+
+    def next_tick(self):
+        """
+        Return the input for the next simulation tick.
+        """
+        if self.hold <= 0:
+            # Mostly forwards, so runs actually get somewhere
+            self.direction = self.rng.choices(['right', 'left', None], weights=[6, 2, 1])[0]
+            self.hold = self.rng.randint(10, 90)
+        self.hold -= 1
+        return InputState(left=self.direction == 'left', right=self.direction == 'right',
+                          jump=self.rng.random() < 0.05, attack=self.rng.random() < 0.05)
+
+class RunnerPolicy:
+    """
+    Plays like a speedrunner: always runs right, jumps at the end of a
+    platform or when something is in the way, double-jumps at the top of a
+    jump that didn't clear the obstacle or when falling with nothing below,
+    and attacks enemies in front of it.
+    """
+    def __init__(self, seed):
+        """
+        Initialize the policy; it is deterministic, so the seed is unused.
+        """
+        self.game = None
+
+    def bind(self, game):
+        """
+        Give the policy the game it plays, so it can look at the level.
+        """
+        self.game = game
+
+    def handle_event(self, event):
+        """
+        Policies ignore the keyboard.
+        """
+
+    def queue_stat(self, stat):
+        """
+        Policies ignore clicks.
+        """
+
+    def next_tick(self):
+        """
+        Return the input for the next simulation tick.
+        """
+        player = self.game.player
+        level = self.game.level
+        rect = player.rect
+        on_ground = bool(level.platforms_colliding(rect.move(0, 2)))
+        ground_ahead = level.platforms_colliding(pygame.Rect(rect.right, rect.bottom, PLAYER_SPEED * 4, 4))
+        blocked = level.platforms_colliding(rect.move(PLAYER_SPEED, -2))
+        below = level.platforms_colliding(pygame.Rect(rect.x, rect.bottom, rect.width * 2, 300))
+        enemy_ahead = level.enemies_colliding(pygame.Rect(rect.right, rect.y, 60, rect.height))
+        if on_ground:
+            jump = not ground_ahead or bool(blocked)
+        else:
+            jump = (player.change_y >= 0 and bool(blocked)) or (player.change_y > 3 and not below)
+        return InputState(right=True, jump=jump, attack=bool(enemy_ahead))
+
+POLICIES = {
+    'random': RandomPolicy,
+    'runner': RunnerPolicy,
+}
+
+def total_xp(player):
+    """
+    All the XP a player has earned, including what went into levelling up.
+    """
+    return sum(100 * level for level in range(1, player.character_level)) + player.xp
+
+def run_simulation(job):
+    """
+    Play one headless game and return its results. job is a tuple of
+    (seed, policy name, ticks); this runs in a pool worker.
+    """
+    from main import Game, SCREEN_HEIGHT # Imported in the worker, after the video driver is set
+    seed, policy_name, ticks = job
+    policy = POLICIES[policy_name](seed)
+    game = Game(headless=True, seed=seed, input_source=policy)
+    policy.bind(game)
+    level_seed = game.level.seed
+
+    level = game.level
+    finished_distance = 0 # Length of the levels already completed
+    finished_kills = 0
+    levels_completed = 0
+    furthest = game.player.rect.right
+    fell = False
+    tick = 0
+    start = time.perf_counter()
+    while tick < ticks:
+        game.simulate(1)
+        tick += 1
+        if game.level is not level:
+            finished_distance += level.width
+            finished_kills += len(level.killed_enemies)
+            levels_completed += 1
+            level = game.level
+            furthest = 0
+        furthest = max(furthest, game.player.rect.right)
+        if game.player.rect.top > SCREEN_HEIGHT + FALL_DEPTH:
+            fell = True
+            break
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'seed': seed,
+        'level_seed': level_seed,
+        'policy': policy_name,
+        'ticks': tick,
+        'distance': finished_distance + furthest,
+        'levels_completed': levels_completed,
+        'fell': fell,
+        'kills': finished_kills + len(level.killed_enemies),
+        'xp': total_xp(game.player),
+        'ticks_per_second': tick / elapsed if elapsed > 0 else float('inf'),
+    }
+    game.quit()
+    return result
+
+def _init_worker():
+    """
+    Keep the games' console messages out of the report.
+    """
+    sys.stdout = open(os.devnull, 'w')
+
+def run_batch(runs, ticks, policies, workers=None, seed=DEFAULT_SEED, progress=None):
+    """
+    Play runs games per policy on seeds seed, seed + 1, ... across a pool
+    of worker processes, and return their results. progress, if given, is
+    called with (done, total) as results come in.
+    """
+    jobs = [(seed + i, policy, ticks) for policy in policies for i in range(runs)]
+    results = []
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        for result in pool.imap_unordered(run_simulation, jobs, chunksize=max(1, len(jobs) // (len(jobs) // 4 + 1))):
+            results.append(result)
+            if progress is not None:
+                progress(len(results), len(jobs))
+    results.sort(key=lambda result: (result['policy'], result['seed']))
+    return results
+
+def report(results, elapsed):
+    """
+    Print per-policy aggregates and the seeds that went worst.
+    """
+    print(f"{'policy':<10}{'runs':>6}{'distance':>10}{'p10 dist':>10}{'fell':>7}{'levels':>8}"
+          f"{'kills':>7}{'xp':>8}{'ticks/s':>9}")
+    for policy in sorted({result['policy'] for result in results}):
+        runs = [result for result in results if result['policy'] == policy]
+        distances = sorted(result['distance'] for result in runs)
+        print(f"{policy:<10}{len(runs):>6}"
+              f"{statistics.mean(distances):>10.0f}"
+              f"{distances[len(distances) // 10]:>10.0f}"
+              f"{sum(result['fell'] for result in runs) / len(runs):>7.0%}"
+              f"{statistics.mean(result['levels_completed'] for result in runs):>8.2f}"
+              f"{statistics.mean(result['kills'] for result in runs):>7.1f}"
+              f"{statistics.mean(result['xp'] for result in runs):>8.0f}"
+              f"{statistics.mean(result['ticks_per_second'] for result in runs):>9.0f}")
+
+    print(f"\nshortest runs (seed, policy, distance):")
+    for result in sorted(results, key=lambda result: result['distance'])[:WORST_SEEDS]:
+        print(f"  {result['seed']:<8}{result['policy']:<10}{result['distance']:>8}")
+    print(f"\n{len(results)} games in {elapsed:.1f}s ({len(results) / elapsed * 3600:.0f} per hour)")
+
+def main():
+    """
+    Parse the command line, run the batch and print the report.
+    """
+    parser = argparse.ArgumentParser(description="Glitchborn batch playtesting")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help="games to play per policy")
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS, help="most ticks to play per game")
+    parser.add_argument('--policy', default=DEFAULT_POLICIES, help=f"comma-separated policies: {', '.join(POLICIES)}")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="seed of the first game")
+    parser.add_argument('--csv', help="also write every game's results to this CSV file")
+    args = parser.parse_args()
+    policies = args.policy.split(',')
+    for policy in policies:
+        if policy not in POLICIES:
+            parser.error(f"unknown policy {policy!r}")
+
+    def progress(done, total):
+        print(f"\r{done}/{total} games", end='', file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    results = run_batch(args.runs, args.ticks, policies, args.workers, args.seed, progress)
+    print(file=sys.stderr)
+    report(results, time.perf_counter() - start)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Deterministic performance benchmarks for Glitchborn.
+
+Runs headless (no window) with fixed seeds and scripted input, and reports
+ticks per second for the main hot paths at several level sizes. Run it from
+anywhere with:
+
+    python glitchborn/src/benchmark.py [--ticks N] [--chunks 4,40,400] [--seed S]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import random
+import time
+import pygame
+from level import Level, CHUNK_WIDTH
+from player import Player
+from controls import InputState, ScriptedInput
+from main import Game, SCREEN_WIDTH, SCREEN_HEIGHT
+from camera import Camera
+from particles import ParticlePool, PARTICLE_KINDS, PARTICLE_CAPACITY
+from ecs import TICK_MS
+
+# --- Constants ---
+DEFAULT_TICKS = 2000
+DEFAULT_CHUNKS = [4, 40, 400]
+DEFAULT_SEED = 1234
+SCROLL_SPEED = 5 # Pixels per tick the camera sweeps across the level
+
+def run_right_and_jump(ticks, jump_every=40):
+    """
+    A scripted input that holds right and jumps at a fixed interval.
+    """
+    return [InputState(right=True, jump=(tick % jump_every == 0)) for tick in range(ticks)]
+
+def make_level(seed, chunks):
+    """
+    Build a level with every chunk loaded, so the sprite counts grow with
+    the level length instead of staying bounded by streaming.
+    """
+    distance = chunks * CHUNK_WIDTH
+    return Level(seed=seed, chunk_count=chunks, load_distance=distance, evict_distance=distance)
+
+def sweep_camera(level, tick):
+    """
+    Move the camera back and forth across the level.
+    """
+    span = max(level.chunk_count * CHUNK_WIDTH - SCREEN_WIDTH, 1)
+    offset = (tick * SCROLL_SPEED) % (2 * span)
+    level.camera.x = offset if offset < span else 2 * span - offset
+
+def time_ticks(ticks, step):
+    """
+    Call step(tick) for each tick and return the achieved ticks per second.
+    """
+    start = time.perf_counter()
+    for tick in range(ticks):
+        step(tick)
+    elapsed = time.perf_counter() - start
+    return ticks / elapsed if elapsed > 0 else float('inf')
+
+def bench_player_update(level, ticks):
+    """
+    Player physics and collision resolution, running right and jumping.
+    """
+    player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+    level.add_player(player)
+    script = run_right_and_jump(ticks)
+
+    def step(tick):
+        # Start over regularly so the player doesn't fall out of the level
+        if tick % 300 == 0:
+            player.rect.topleft = (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+            player.change_y = 0
+        player.controls = script[tick]
+        if player.controls.jump:
+            player.jump()
+        player.update()
+        level.world.update(level.tick_ms)
+    return time_ticks(ticks, step)
+
+def bench_level_update(level, ticks):
+    """
+    Enemy updates and chunk streaming while the camera sweeps the level.
+    """
+    def step(tick):
+        sweep_camera(level, tick)
+        level.update()
+    return time_ticks(ticks, step)
+
+def bench_collision(level, ticks, seed):
+    """
+    Platform overlap queries at random player-sized rects.
+    """
+    rng = random.Random(seed)
+    width = level.chunk_count * CHUNK_WIDTH
+    rects = [pygame.Rect(rng.randrange(width), rng.randrange(SCREEN_HEIGHT), 96, 128) for _ in range(ticks)]
+    return time_ticks(ticks, lambda tick: level.platforms_colliding(rects[tick]))
+
+def bench_render(level, screen, ticks):
+    """
+    Drawing the background, platforms and enemies while the camera sweeps.
+    """
+    def step(tick):
+        sweep_camera(level, tick)
+        level.camera.interpolate(1.0)
+        level.draw(screen)
+    return time_ticks(ticks, step)
+
+def bench_particles(screen, ticks, seed):
+    """
+    Updating and drawing a particle pool kept close to full by bursts.
+    Returns (ticks per second, average live particles).
+    """
+    pool = ParticlePool(PARTICLE_KINDS, PARTICLE_CAPACITY, seed=seed)
+    camera = Camera()
+    view = camera.view_rect
+    # Bursts live about 36 ticks, so this many per tick keeps the pool full
+    per_tick = PARTICLE_CAPACITY * TICK_MS // PARTICLE_KINDS['burst']['lifetime'] + 1
+    live = 0
+
+    def step(tick):
+        nonlocal live
+        pool.emit('burst', SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2, int(per_tick))
+        pool.update(TICK_MS)
+        pool.draw(screen, camera, view)
+        live += len(pool)
+    rate = time_ticks(ticks, step)
+    return rate, live / ticks
+
+def bench_game(ticks, seed):
+    """
+    Full headless game ticks (input, update and draw) with scripted input.
+    """
+    game = Game(headless=True, seed=seed, input_source=ScriptedInput(run_right_and_jump(ticks)))
+    return time_ticks(ticks, lambda tick: game.simulate(1, render=True))
+
+def main():
+    """
+    Parse the command line and print a table of results.
+    """
+    parser = argparse.ArgumentParser(description="Glitchborn performance benchmarks")
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS, help="ticks to run per benchmark")
+    parser.add_argument('--chunks', default=','.join(str(c) for c in DEFAULT_CHUNKS),
+                        help="comma-separated level lengths, in chunks")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="level and input seed")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    print(f"{'benchmark':<16}{'chunks':>8}{'platforms':>11}{'enemies':>9}{'ticks/s':>12}")
+    for chunks in [int(c) for c in args.chunks.split(',')]:
+        level = make_level(args.seed, chunks)
+        platforms = len(level.platform_list)
+        enemies = len(level.enemy_list)
+        results = [
+            ('player_update', bench_player_update(level, args.ticks)),
+            ('level_update', bench_level_update(level, args.ticks)),
+            ('collision', bench_collision(level, args.ticks, args.seed)),
+            ('render', bench_render(level, screen, args.ticks)),
+        ]
+        for name, rate in results:
+            print(f"{name:<16}{chunks:>8}{platforms:>11}{enemies:>9}{rate:>12.0f}")
+
+    rate, live = bench_particles(screen, args.ticks, args.seed)
+    print(f"{'particles':<16}{'':>8}{'live':>11}{live:>9.0f}{rate:>12.0f}")
+    print(f"{'game':<16}{'':>8}{'':>11}{'':>9}{bench_game(args.ticks, args.seed):>12.0f}")
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
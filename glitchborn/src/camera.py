@@ -0,0 +1,61 @@
+import pygame
+
+# --- Constants ---
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+class Camera:
+    """
+    Tracks which part of the world is on screen. Every entity stays in world
+    coordinates; the camera offset is only applied at draw time, so scrolling
+    is a single assignment no matter how many sprites the level holds.
+    """
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        """
+        Initialize the camera at the world origin.
+        """
+        self.x = 0
+        # Where the camera was at the start of the tick, and where it is drawn
+        # from, which falls between the two when rendering is interpolated
+        self.prev_x = 0
+        self.draw_x = 0
+        self.width = width
+        self.height = height
+
+    @property
+    def view_rect(self):
+        """
+        The area of the world currently on screen, in world coordinates.
+        """
+        return pygame.Rect(self.x, 0, self.width, self.height)
+
+    def scroll(self, dx):
+        """
+        Move the camera dx pixels to the right (negative moves it left).
+        """
+        self.x += dx
+
+    def begin_tick(self):
+        """
+        Remember the current position before a simulation tick moves it.
+        """
+        self.prev_x = self.x
+
+    def interpolate(self, alpha):
+        """
+        Place the drawing offset alpha of the way from the previous tick's
+        position to the current one.
+        """
+        self.draw_x = self.prev_x + (self.x - self.prev_x) * alpha
+
+    def apply(self, rect):
+        """
+        Convert a world-space rect to a screen-space rect.
+        """
+        return rect.move(-self.x, 0)
+
+    def draw_rect(self, rect):
+        """
+        Convert a world-space rect to where it should be drawn this frame.
+        """
+        return rect.move(-round(self.draw_x), 0)
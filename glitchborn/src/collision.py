@@ -0,0 +1,70 @@
+# --- Constants ---
+NO_HIT = (1.0, (0, 0), None)
+
+def swept_bounds(rect, dx, dy):
+    """
+    Return a rect covering rect over its whole move by (dx, dy), for use as
+    a broadphase query.
+    """
+    end = rect.copy()
+    end.x += dx
+    end.y += dy
+    return rect.union(end).inflate(2, 2)
+
+def sweep_aabb(rect, dx, dy, obstacles):
+    """
+    Sweep rect along (dx, dy) against static obstacle rects and find the
+    first one it runs into.
+
+    Returns (time_of_impact, normal, obstacle): time_of_impact is the
+    fraction of the move (0.0 to 1.0) completed before contact, normal is
+    the contact normal of the obstacle's face that was hit, e.g. (0, -1)
+    for landing on top of it. Without a hit the result is
+    (1.0, (0, 0), None). Obstacles the rect already overlaps are ignored,
+    and merely ending the move touching an obstacle is not a hit.
+    """
+    best = NO_HIT
+    for obstacle in obstacles:
+        # Entry and exit times along x
+        if dx > 0:
+            x_entry = (obstacle.left - rect.right) / dx
+            x_exit = (obstacle.right - rect.left) / dx
+        elif dx < 0:
+            x_entry = (obstacle.right - rect.left) / dx
+            x_exit = (obstacle.left - rect.right) / dx
+        elif rect.right > obstacle.left and rect.left < obstacle.right:
+            x_entry, x_exit = float('-inf'), float('inf')
+        else:
+            continue
+
+        # Entry and exit times along y
+        if dy > 0:
+            y_entry = (obstacle.top - rect.bottom) / dy
+            y_exit = (obstacle.bottom - rect.top) / dy
+        elif dy < 0:
+            y_entry = (obstacle.bottom - rect.top) / dy
+            y_exit = (obstacle.top - rect.bottom) / dy
+        elif rect.bottom > obstacle.top and rect.top < obstacle.bottom:
+            y_entry, y_exit = float('-inf'), float('inf')
+        else:
+            continue
+
+        entry = max(x_entry, y_entry)
+        if entry < 0 or entry >= best[0] or entry > min(x_exit, y_exit):
+            continue
+
+        # The axis that made contact last is the face that was hit
+        if x_entry > y_entry:
+            normal = (-1, 0) if dx > 0 else (1, 0)
+        else:
+            normal = (0, -1) if dy > 0 else (0, 1)
+        best = (entry, normal, obstacle)
+    return best
+
+def masks_overlap(rect, mask, other_rect, other_mask):
+    """
+    Return whether two masks overlap where their rects place them. Meant as
+    the narrowphase after a rect test: masks are only compared for rects
+    that already overlap.
+    """
+    return mask.overlap(other_mask, (other_rect.x - rect.x, other_rect.y - rect.y)) is not None
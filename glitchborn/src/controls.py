@@ -0,0 +1,222 @@
+import pygame
+
+# --- Constants ---
+# Keys that are held down for as long as the action lasts
+HOLD_BINDINGS = {
+    'left': pygame.K_a,
+    'right': pygame.K_d,
+}
+# Keys whose press triggers an action once
+PRESS_BINDINGS = {
+    pygame.K_SPACE: 'jump',
+    pygame.K_f: 'attack',
+    pygame.K_c: 'character_screen',
+    pygame.K_F5: 'checkpoint',
+    pygame.K_F9: 'restart',
+    pygame.K_g: 'shoot',
+}
+# Bit of each on/off action in an input mask
+ACTION_BITS = {
+    'left': 1 << 0,
+    'right': 1 << 1,
+    'jump': 1 << 2,
+    'attack': 1 << 3,
+    'character_screen': 1 << 4,
+    'checkpoint': 1 << 5,
+    'restart': 1 << 6,
+    'shoot': 1 << 10, # Above the stat bits (STAT_SHIFT and up)
+}
+# Stats that can be raised from the character screen; the mask stores the
+# raised stat as its position in this list plus one
+STATS = ('strength', 'dexterity', 'intelligence', 'wisdom', 'charisma')
+STAT_SHIFT = 7
+STAT_BITS = 0b111
+
+class InputState:
+    """
+    The actions the player asked for during one simulation tick. Everything
+    that changes the simulation arrives through here, so a session can be
+    recorded and replayed as one of these per tick.
+    """
+    __slots__ = ('left', 'right', 'jump', 'attack', 'character_screen', 'checkpoint', 'restart', 'shoot',
+                 'raise_stat')
+
+    def __init__(self, left=False, right=False, jump=False, attack=False, character_screen=False, checkpoint=False,
+                 restart=False, shoot=False, raise_stat=None):
+        """
+        Initialize the input state. Everything is released by default;
+        raise_stat is the name of a stat to spend a point on, if any.
+        """
+        self.left = left
+        self.right = right
+        self.jump = jump
+        self.attack = attack
+        self.character_screen = character_screen
+        self.checkpoint = checkpoint
+        self.restart = restart
+        self.shoot = shoot
+        self.raise_stat = raise_stat
+
+    def to_mask(self):
+        """
+        Pack the state into a small integer.
+        """
+        mask = 0
+        for action, bit in ACTION_BITS.items():
+            if getattr(self, action):
+                mask |= bit
+        if self.raise_stat is not None:
+            mask |= (STATS.index(self.raise_stat) + 1) << STAT_SHIFT
+        return mask
+
+    @classmethod
+    def from_mask(cls, mask):
+        """
+        Unpack a state packed by to_mask().
+        """
+        state = cls(**{action: bool(mask & bit) for action, bit in ACTION_BITS.items()})
+        stat = (mask >> STAT_SHIFT) & STAT_BITS
+        if stat:
+            state.raise_stat = STATS[stat - 1]
+        return state
+
+class KeyboardInput:
+    """
+    Reads the player's actions from the keyboard.
+    """
+    def __init__(self):
+        """
+        Initialize the keyboard input.
+        """
+        # Presses seen since the last tick; each one is delivered only once
+        self.pressed = set()
+        self.raise_stat = None
+
+    def handle_event(self, event):
+        """
+        Record key presses from the pygame event queue.
+        """
+        if event.type == pygame.KEYDOWN:
+            action = PRESS_BINDINGS.get(event.key)
+            if action:
+                self.pressed.add(action)
+
+    def queue_stat(self, stat):
+        """
+        Spend a stat point on stat in the next tick, e.g. after a click on
+        the character screen.
+        """
+        self.raise_stat = stat
+
+    def next_tick(self):
+        """
+        Return the input for the next simulation tick.
+        """
+        keys = pygame.key.get_pressed()
+        state = InputState(left=bool(keys[HOLD_BINDINGS['left']]), right=bool(keys[HOLD_BINDINGS['right']]))
+        for action in self.pressed:
+            setattr(state, action, True)
+        self.pressed.clear()
+        state.raise_stat, self.raise_stat = self.raise_stat, None
+        return state
+
+class ScriptedInput:
+    """
+    Replays a scripted sequence of input states, one per tick, so the game
+    can be driven without a keyboard. Once the script runs out the player
+    stands still.
+    """
+    def __init__(self, script):
+        """
+        Initialize the scripted input from an iterable of InputState (None
+        entries mean no input that tick).
+        """
+        self.script = iter(script)
+
+    def handle_event(self, event):
+        """
+        Scripted input ignores the keyboard.
+        """
+
+    def queue_stat(self, stat):
+        """
+        Scripted input ignores clicks.
+        """
+
+    def next_tick(self):
+        """
+        Return the input for the next simulation tick.
+        """
+        state = next(self.script, None)
+        return state if state is not None else InputState()
+
+class RecordingInput:
+    """
+    Wraps another input source and records the mask of every tick it
+    delivers.
+    """
+    def __init__(self, source):
+        """
+        Initialize the recorder around source.
+        """
+        self.source = source
+        self.masks = []
+
+    def handle_event(self, event):
+        """
+        Pass the event on to the recorded source.
+        """
+        self.source.handle_event(event)
+
+    def queue_stat(self, stat):
+        """
+        Pass the click on to the recorded source.
+        """
+        self.source.queue_stat(stat)
+
+    def next_tick(self):
+        """
+        Return the source's input for the next tick, recording it.
+        """
+        state = self.source.next_tick()
+        self.masks.append(state.to_mask())
+        return state
+
+class ReplayInput:
+    """
+    Plays back recorded input masks, one per tick. Once they run out the
+    player stands still.
+    """
+    def __init__(self, masks):
+        """
+        Initialize the playback from a sequence of input masks.
+        """
+        self.masks = masks
+        self.tick = 0
+
+    @property
+    def finished(self):
+        """
+        Whether every recorded tick has been played.
+        """
+        return self.tick >= len(self.masks)
+
+    def handle_event(self, event):
+        """
+        Playback ignores the keyboard.
+        """
+
+    def queue_stat(self, stat):
+        """
+        Playback ignores clicks.
+        """
+
+    def next_tick(self):
+        """
+        Return the recorded input for the next tick.
+        """
+        if self.finished:
+            return InputState()
+        state = InputState.from_mask(self.masks[self.tick])
+        self.tick += 1
+        return state
@@ -0,0 +1,246 @@
+import numpy as np
+
+# --- Constants ---
+INITIAL_CAPACITY = 128 # Entity slots allocated up front; doubles when full
+# Default length of one simulation tick. Speeds and accelerations are given
+# per tick of this length, and systems scale them to the actual tick
+TICK_MS = 1000 / 60
+
+# Component name -> {field name: dtype}. Every component is stored as one
+# NumPy column per field, indexed by entity id, plus a mask of which
+# entities have it. Components without fields are tags.
+COMPONENTS = {
+    'position': {'x': np.float64, 'y': np.float64},
+    'previous': {'x': np.float64, 'y': np.float64}, # Position at the start of the tick, for render interpolation
+    'size': {'w': np.int32, 'h': np.int32},
+    'velocity': {'dx': np.float64, 'dy': np.float64},
+    'gravity': {'strength': np.float64},
+    'patrol': {'min_x': np.float64, 'max_x': np.float64, 'speed': np.float64, 'direction': np.int32},
+    'attack': {'start': np.float64, 'duration': np.float64, 'active': np.bool_},
+    'chase': {'speed': np.float64}, # Follows the level's navigation graph to the player
+    # The grid cells an entity was last bucketed under in a SpatialGrid
+    'indexed': {'left': np.int32, 'top': np.int32, 'right': np.int32, 'bottom': np.int32},
+    'body': {}, # Moved by the movement system with collision against solids
+    'solid': {}, # Blocks bodies (platforms)
+    'sprite': {}, # Drawn by the render system from the entity's object
+}
+
+class ComponentField:
+    """
+    Exposes one component field of an entity as a plain attribute of the
+    object that stands for it (usually its sprite), so gameplay code can
+    keep writing `self.change_y = 0` while the value lives in the world's
+    arrays. Until the object is attached to a world the value is kept on
+    the object, and World.attach copies it in.
+    """
+    def __init__(self, component, field):
+        """
+        Initialize the descriptor for one field of one component.
+        """
+        self.component = component
+        self.field = field
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        """
+        Remember the attribute name, under which the value is kept on the
+        object while it is not attached.
+        """
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        """
+        Read the field from the object's world, or from the object itself
+        while it is not attached.
+        """
+        if obj is None:
+            return self
+        world = obj.__dict__.get('world')
+        if world is None:
+            return obj.__dict__[self.name]
+        return world.columns[self.component][self.field][obj.entity].item()
+
+    def __set__(self, obj, value):
+        """
+        Write the field to the object's world, or to the object itself
+        while it is not attached.
+        """
+        world = obj.__dict__.get('world')
+        if world is None:
+            obj.__dict__[self.name] = value
+        else:
+            world.columns[self.component][self.field][obj.entity] = value
+
+def component_fields(cls):
+    """
+    Return the ComponentField descriptors declared on a class and its bases.
+    """
+    fields = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, ComponentField):
+                fields[name] = value
+    return fields
+
+class World:
+    """
+    A small entity-component-system store. Entities are integer ids;
+    components are NumPy columns indexed by id, so systems can process every
+    entity with a given set of components in one batched operation instead
+    of dispatching per sprite. Systems are plain functions of the world,
+    run in the order they were added.
+    """
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        """
+        Initialize an empty world.
+        """
+        self.time = 0.0 # Simulated milliseconds
+        self.tick_scale = 1.0 # Length of the current tick in TICK_MS ticks
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.masks = {name: np.zeros(capacity, dtype=bool) for name in COMPONENTS}
+        self.columns = {name: {field: np.zeros(capacity, dtype=dtype) for field, dtype in fields.items()}
+                        for name, fields in COMPONENTS.items()}
+        # The object (sprite) each entity stands for, if any
+        self.objects = [None] * capacity
+        self.free_ids = []
+        self.next_id = 0
+        self.systems = []
+        # Query results, reused until an entity or component is added or removed
+        self._queries = {}
+
+    def _grow(self):
+        """
+        Double the capacity of every column.
+        """
+        old_capacity = len(self.alive)
+        capacity = old_capacity * 2
+
+        def grown(array):
+            new = np.zeros(capacity, dtype=array.dtype)
+            new[:old_capacity] = array
+            return new
+        self.alive = grown(self.alive)
+        self.masks = {name: grown(mask) for name, mask in self.masks.items()}
+        self.columns = {name: {field: grown(column) for field, column in fields.items()}
+                        for name, fields in self.columns.items()}
+        self.objects.extend([None] * (capacity - old_capacity))
+        self._queries.clear()
+
+    def create(self, obj=None, **components):
+        """
+        Create an entity with the given components, e.g.
+        create(position={'x': 0, 'y': 0}, solid=None). Returns its id.
+        """
+        if self.free_ids:
+            entity = self.free_ids.pop()
+        else:
+            if self.next_id == len(self.alive):
+                self._grow()
+            entity = self.next_id
+            self.next_id += 1
+        self.alive[entity] = True
+        self.objects[entity] = obj
+        self._queries.clear()
+        for name, values in components.items():
+            self.add_component(entity, name, **(values or {}))
+        return entity
+
+    def destroy(self, entity):
+        """
+        Remove an entity and all of its components.
+        """
+        self.alive[entity] = False
+        for mask in self.masks.values():
+            mask[entity] = False
+        self.objects[entity] = None
+        self.free_ids.append(entity)
+        self._queries.clear()
+
+    def add_component(self, entity, name, **values):
+        """
+        Give an entity a component. Fields that aren't given start at zero.
+        """
+        self.masks[name][entity] = True
+        self._queries.clear()
+        for field, column in self.columns[name].items():
+            column[entity] = values.get(field, 0)
+
+    def remove_component(self, entity, name):
+        """
+        Take a component away from an entity.
+        """
+        self.masks[name][entity] = False
+        self._queries.clear()
+
+    def has(self, entity, name):
+        """
+        Return whether an entity has a component.
+        """
+        return bool(self.masks[name][entity])
+
+    def query(self, *names, exclude=()):
+        """
+        Return the ids of live entities that have every named component and
+        none of the excluded ones, as a NumPy array. Don't modify it: the
+        result is cached until the set of entities or components changes.
+        """
+        key = (names, exclude)
+        entities = self._queries.get(key)
+        if entities is None:
+            mask = self.alive.copy()
+            for name in names:
+                mask &= self.masks[name]
+            for name in exclude:
+                mask &= ~self.masks[name]
+            entities = self._queries[key] = np.flatnonzero(mask)
+        return entities
+
+    def attach(self, obj, **components):
+        """
+        Create an entity for obj. The values of obj's ComponentField
+        attributes are copied into the matching components, and from then on
+        those attributes read and write the world's arrays.
+        """
+        entity = self.create(obj, **components)
+        fields = component_fields(type(obj))
+        for name, descriptor in fields.items():
+            if descriptor.component in components and name in obj.__dict__:
+                self.columns[descriptor.component][descriptor.field][entity] = obj.__dict__.pop(name)
+        obj.world = self
+        obj.entity = entity
+        return entity
+
+    def detach(self, obj):
+        """
+        Destroy obj's entity, copying its ComponentField values back onto obj.
+        """
+        if obj.__dict__.get('world') is not self:
+            return
+        entity = obj.entity
+        values = {name: getattr(obj, name) for name, descriptor in component_fields(type(obj)).items()
+                  if self.masks[descriptor.component][entity]}
+        obj.world = None
+        obj.entity = None
+        obj.__dict__.update(values)
+        self.destroy(entity)
+
+    def add_system(self, system):
+        """
+        Add a system, a function called with the world on every update.
+        """
+        self.systems.append(system)
+
+    def update(self, dt_ms=TICK_MS):
+        """
+        Advance simulated time by one tick and run every system.
+        """
+        self.time += dt_ms
+        self.tick_scale = dt_ms / TICK_MS
+        for system in self.systems:
+            system(self)
+
+    def __len__(self):
+        """
+        The number of live entities.
+        """
+        return int(self.alive.sum())
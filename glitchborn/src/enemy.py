@@ -1,44 +1,200 @@
 import pygame
+from assets import solid_surface
+from animation import Animation, FrameTable, shared_table
+from ecs import ComponentField
 
 # --- Constants ---
 ENEMY_WIDTH = 32
 ENEMY_HEIGHT = 32
 ENEMY_COLOR = (255, 0, 0) # Red
 PATROL_SPEED = 2
+PATROL_RANGE = 100 # Default distance an enemy walks from its start
+CHASE_SPEED = 3 # Slower than the player, who can always outrun a chaser
+CHASE_RADIUS = 350 # Enemies this close to the player start chasing it
+LOSE_RADIUS = 700 # Chasers give up once the player is this far away
 
 class Enemy(pygame.sprite.Sprite):
     """
-    Represents an enemy in the game.
+    Represents an enemy in the game. The enemy's position and patrol state
+    live in the level's World and are advanced by the patrol system; the
+    sprite's rect is only brought up to date for enemies near the screen.
+    An enemy the player comes close to swaps its patrol component for a
+    chase component and follows the level's navigation graph instead.
     """
-    def __init__(self, x, y, patrol_range=100):
+    direction = ComponentField('patrol', 'direction') # 1 for right, -1 for left
+
+    def __init__(self, x, y, patrol_range=PATROL_RANGE, spawn_id=None):
         """
         Initialize the enemy.
         """
         super().__init__()
-        self.image = pygame.Surface([ENEMY_WIDTH, ENEMY_HEIGHT])
-        self.image.fill(ENEMY_COLOR)
+        # Every enemy shares the same frame table
+        self.animation = Animation(shared_table('enemy', lambda: FrameTable(
+            {'idle': [solid_surface((ENEMY_WIDTH, ENEMY_HEIGHT), ENEMY_COLOR)]})))
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
         self.xp_reward = (20, 30) # Range of XP granted when defeated
+        self.spawn_id = spawn_id # Identifies this enemy within its generated level
 
         # --- Patrolling AI ---
         self.start_x = x
         self.patrol_range = patrol_range
-        self.direction = 1 # 1 for right, -1 for left
+        self.direction = 1
+        self.spawn = (x, y, patrol_range)
 
-    def update(self):
+        # --- Chasing AI ---
+        self.chase_node = None # The platform the chaser is on, or took off from
+        self.chase_edge = None # The jump it is in the middle of, if any
+        self.chase_tick = 0
+        self.chase_offset = 0.0 # How far from the edge's takeoff point the jump started
+
+        # Set when the enemy is added to a level and attached to its World
+        self.level = None
+        self.world = None
+        self.entity = None
+
+    @property
+    def image(self):
+        """
+        The current animation frame.
+        """
+        return self.animation.image
+
+    @property
+    def mask(self):
+        """
+        The pixel mask of the current animation frame.
+        """
+        return self.animation.mask
+
+    @property
+    def components(self):
+        """
+        The components this enemy is attached to a World with.
+        """
+        return {
+            'position': {'x': self.rect.x, 'y': self.rect.y},
+            'previous': {'x': self.rect.x, 'y': self.rect.y},
+            'size': {'w': self.rect.width, 'h': self.rect.height},
+            'patrol': {'min_x': self.start_x, 'max_x': self.start_x + self.patrol_range, 'speed': PATROL_SPEED},
+            'sprite': None,
+        }
+
+    @property
+    def chasing(self):
+        """
+        Whether the enemy is chasing the player.
+        """
+        return self.world is not None and self.world.has(self.entity, 'chase')
+
+    def start_chase(self, node):
+        """
+        Stop patrolling and chase the player, starting from the platform
+        node of the level's navigation graph.
         """
-        Update the enemy's behavior (e.g., patrolling).
+        self.chase_node = node
+        self.chase_edge = None
+        self.world.remove_component(self.entity, 'patrol')
+        self.world.add_component(self.entity, 'chase', speed=CHASE_SPEED)
+
+    def _patrol(self, start_x, patrol_range):
+        """
+        Go back to patrolling patrol_range pixels to the right of start_x.
+        """
+        self.start_x = start_x
+        self.patrol_range = patrol_range
+        self.chase_node = None
+        self.chase_edge = None
+        self.world.remove_component(self.entity, 'chase')
+        self.world.add_component(self.entity, 'patrol', min_x=start_x, max_x=start_x + patrol_range,
+                                 speed=PATROL_SPEED, direction=1)
+
+    def stop_chase(self):
+        """
+        Give up the chase and patrol the platform the enemy is standing on.
+        """
+        platform = self.level.nav.nodes.get(self.chase_node)
+        if platform is None:
+            self.return_to_spawn()
+            return
+        x = self.world.columns['position']['x'][self.entity]
+        left = platform[0]
+        right = platform[0] + platform[2] - self.rect.width
+        patrol_range = max(min(self.spawn[2], right - left), 0)
+        self._patrol(min(max(x - patrol_range / 2, left), right - patrol_range), patrol_range)
+
+    def return_to_spawn(self):
+        """
+        Stop chasing and put the enemy back where it was generated.
         """
-        self.rect.x += PATROL_SPEED * self.direction
+        x, y, patrol_range = self.spawn
+        self.rect.topleft = (x, y)
+        for component in ('position', 'previous'):
+            self.world.columns[component]['x'][self.entity] = x
+            self.world.columns[component]['y'][self.entity] = y
+        self._patrol(x, patrol_range)
 
-        # Check if we've reached the edge of the patrol range
-        if self.rect.x > self.start_x + self.patrol_range:
-            self.direction = -1
-            # To prevent overshooting, snap back to the edge
-            self.rect.x = self.start_x + self.patrol_range
-        elif self.rect.x < self.start_x:
-            self.direction = 1
-            # Snap back to the edge
-            self.rect.x = self.start_x
+    def chase_step(self):
+        """
+        Move one tick along the navigation graph towards the player: walk to
+        the next jump's takeoff point, follow its arc, and once on the
+        player's platform walk straight at it. Nothing makes a chaser fall,
+        so on a platform it never walks past the platform's ends. Called by
+        the chase system.
+        """
+        nav = self.level.nav
+        player = self.level.player
+        position = self.world.columns['position']
+        x = position['x'][self.entity]
+        foot_x = x + self.rect.width / 2
+        edge = self.chase_edge
+
+        if edge is None:
+            if player is None or abs(player.rect.centerx - foot_x) > LOSE_RADIUS:
+                self.stop_chase()
+                return
+            path = nav.path(self.chase_node, self.level.player_node)
+            if path is None:
+                self.stop_chase()
+                return
+            target_x = path[0].takeoff_x if path else player.rect.centerx
+            left, _, platform_width, _ = nav.nodes[self.chase_node]
+            half_width = self.rect.width / 2
+            target_x = max(left + half_width, min(target_x, left + platform_width - half_width))
+            speed = self.world.columns['chase']['speed'][self.entity] * self.world.tick_scale
+            step = max(-speed, min(speed, target_x - foot_x))
+            position['x'][self.entity] = x + step
+            if path and abs(target_x - foot_x) <= speed:
+                # As close to the takeoff point as the platform allows: jump,
+                # easing from here onto the edge's arc
+                self.chase_edge = path[0]
+                self.chase_tick = 0
+                self.chase_offset = x + step + half_width - path[0].takeoff_x
+            return
+
+        source = nav.nodes.get(self.chase_node)
+        target = nav.nodes.get(edge.target)
+        if source is None or target is None:
+            # The level streamed the platforms out from under the jump
+            self.return_to_spawn()
+            return
+        # Edges are timed in TICK_MS ticks
+        self.chase_tick += self.world.tick_scale
+        foot_x, foot_y = edge.position(source[1], target[1], self.chase_tick)
+        foot_x += self.chase_offset * max(0.0, 1 - self.chase_tick / edge.ticks)
+        position['x'][self.entity] = foot_x - self.rect.width / 2
+        position['y'][self.entity] = foot_y - self.rect.height
+        if self.chase_tick >= edge.ticks:
+            self.chase_node = edge.target
+            self.chase_edge = None
+
+    def update(self):
+        """
+        Update the enemy's sprite. Patrolling itself is simulated for all
+        enemies at once by the patrol system; this copies the result into rect.
+        """
+        if self.world is not None:
+            position = self.world.columns['position']
+            self.rect.x = int(position['x'][self.entity])
+            self.rect.y = int(position['y'][self.entity])
@@ -0,0 +1,319 @@
+"""
+Game events.
+
+Gameplay code publishes what happened (an enemy was hit or killed, XP was
+gained, ...) on an EventBus, and whatever cares subscribes to it: the XP
+and drop rules, the console log, later the HUD or sound. Subscribers are
+called synchronously in the order they subscribed, so the simulation stays
+deterministic.
+
+An event with a key is de-duplicated: while the same key keeps being
+published tick after tick (the player standing in an enemy, say), only the
+first tick's event is delivered.
+"""
+import queue
+import sys
+import threading
+
+# --- Constants ---
+LOG_FLUSH_SECONDS = 0.25 # How often the log sink writes out what it has collected
+
+class GameEvent:
+    """
+    Base class of the events published on an EventBus. Events hold plain
+    values only, so they can be formatted on another thread after the tick
+    that published them.
+    """
+    __slots__ = ()
+
+    @property
+    def key(self):
+        """
+        What identifies a repeat of this event on consecutive ticks, or None
+        if every one is delivered.
+        """
+        return None
+
+    def message(self):
+        """
+        The log line for this event, or None to leave it out of the log.
+        """
+        return None
+
+class Hit(GameEvent):
+    """
+    An enemy touched the player at (x, y).
+    """
+    __slots__ = ('spawn_id', 'x', 'y')
+
+    def __init__(self, spawn_id, x, y):
+        """
+        Initialize the event for the enemy spawn_id, touching at (x, y).
+        """
+        self.spawn_id = spawn_id
+        self.x = x
+        self.y = y
+
+    @property
+    def key(self):
+        """
+        Hits by the same enemy on consecutive ticks are one contact.
+        """
+        return ('hit', self.spawn_id)
+
+    def message(self):
+        """
+        The log line for this event.
+        """
+        return "Player hit an enemy!"
+
+class Kill(GameEvent):
+    """
+    The player's attack killed an enemy.
+    """
+    __slots__ = ('spawn_id', 'xp_reward', 'x', 'y')
+
+    def __init__(self, spawn_id, xp_reward, x, y):
+        """
+        Initialize the event for the enemy spawn_id, killed at (x, y).
+        """
+        self.spawn_id = spawn_id
+        self.xp_reward = xp_reward
+        self.x = x
+        self.y = y
+
+class ItemDropped(GameEvent):
+    """
+    A killed enemy dropped an item.
+    """
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x, y):
+        """
+        Initialize the event for an item dropped at (x, y).
+        """
+        self.x = x
+        self.y = y
+
+    def message(self):
+        """
+        The log line for this event.
+        """
+        return "Enemy dropped an item!"
+
+class ItemPickedUp(GameEvent):
+    """
+    The player picked up dropped items.
+    """
+    __slots__ = ('count',)
+
+    def __init__(self, count):
+        """
+        Initialize the event for count items picked up at once.
+        """
+        self.count = count
+
+    def message(self):
+        """
+        The log line for this event.
+        """
+        return "Picked up an item!" if self.count == 1 else f"Picked up {self.count} items!"
+
+class XpGained(GameEvent):
+    """
+    The player gained XP.
+    """
+    __slots__ = ('amount', 'xp', 'xp_to_next_level')
+
+    def __init__(self, amount, xp, xp_to_next_level):
+        """
+        Initialize the event with the XP gained and the totals after it.
+        """
+        self.amount = amount
+        self.xp = xp
+        self.xp_to_next_level = xp_to_next_level
+
+    def message(self):
+        """
+        The log line for this event.
+        """
+        return f"Player gained {self.amount} XP! Total XP: {self.xp}/{self.xp_to_next_level}"
+
+class LevelUp(GameEvent):
+    """
+    The player reached a new character level.
+    """
+    __slots__ = ('character_level', 'available_stat_points')
+
+    def __init__(self, character_level, available_stat_points):
+        """
+        Initialize the event with the new level and the points to spend.
+        """
+        self.character_level = character_level
+        self.available_stat_points = available_stat_points
+
+    def message(self):
+        """
+        The log line for this event.
+        """
+        return (f"Ding! You reached level {self.character_level}!\n"
+                f"You have {self.available_stat_points} stat points to spend.")
+
+class StatChanged(GameEvent):
+    """
+    The player spent a stat point.
+    """
+    __slots__ = ('stat', 'value')
+
+    def __init__(self, stat, value):
+        """
+        Initialize the event with the stat's name and new value.
+        """
+        self.stat = stat
+        self.value = value
+
+    def message(self):
+        """
+        The log line for this event.
+        """
+        return f"Increased {self.stat.capitalize()} to {self.value}"
+
+class SaveFailed(GameEvent):
+    """
+    Writing an autosave failed. Reported from the autosave thread straight
+    to the log, not on the bus, whose subscribers run on the game thread.
+    """
+    __slots__ = ('reason',)
+
+    def __init__(self, reason):
+        """
+        Initialize the event with why the save failed.
+        """
+        self.reason = reason
+
+    def message(self):
+        """
+        The log line for this event.
+        """
+        return f"Autosave failed: {self.reason}"
+
+class EventBus:
+    """
+    Delivers published events to the subscribers of their type.
+    """
+    def __init__(self):
+        """
+        Initialize a bus with no subscribers.
+        """
+        self.subscribers = {} # Event type -> callbacks
+        self.everything = [] # Callbacks that get every event
+        # Keys published during the current and the previous tick
+        self._keys = set()
+        self._previous_keys = set()
+
+    def subscribe(self, event_type, callback):
+        """
+        Call callback(event) for every event of event_type published from
+        now on; an event_type of None subscribes to every event.
+        """
+        if event_type is None:
+            self.everything.append(callback)
+        else:
+            self.subscribers.setdefault(event_type, []).append(callback)
+
+    def begin_tick(self):
+        """
+        Start a new simulation tick. Keyed events that are not published
+        again this tick are delivered afresh the next time they are.
+        """
+        self._previous_keys, self._keys = self._keys, self._previous_keys
+        self._keys.clear()
+
+    def publish(self, event):
+        """
+        Deliver event to its subscribers, unless it repeats a keyed event
+        from the previous tick.
+        """
+        key = event.key
+        if key is not None:
+            self._keys.add(key)
+            if key in self._previous_keys:
+                return
+        for callback in self.subscribers.get(type(event), ()):
+            callback(event)
+        for callback in self.everything:
+            callback(event)
+
+class LogSink:
+    """
+    Writes event messages to the console from a background thread, so a
+    slow terminal never holds up a tick. Subscribing it only queues the
+    event; every LOG_FLUSH_SECONDS the thread formats what has collected,
+    folds runs of the same line into one, and writes it all at once.
+    """
+    def __init__(self, stream=None, interval=LOG_FLUSH_SECONDS):
+        """
+        Initialize the sink and start its thread. stream defaults to
+        whatever sys.stdout is when the log is written.
+        """
+        self.stream = stream
+        self.interval = interval
+        self._queue = queue.SimpleQueue()
+        self._closing = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+
+    def __call__(self, event):
+        """
+        Queue event to be logged. Called by the bus on the game thread.
+        """
+        self._queue.put(event)
+
+    def _run(self):
+        """
+        Flush the queue every interval seconds until the sink is closed,
+        then once more.
+        """
+        while True:
+            closing = self._closing.wait(self.interval)
+            self._flush()
+            if closing:
+                return
+
+    def _flush(self):
+        """
+        Write the messages of every queued event. A run of identical
+        consecutive messages is written as its first line with the count
+        appended, e.g. "Player hit an enemy! (x3)".
+        """
+        lines = []
+        last = None
+        repeats = 0
+        while True:
+            try:
+                message = self._queue.get_nowait().message()
+            except queue.Empty:
+                break
+            if message is None:
+                continue
+            if message == last:
+                repeats += 1
+                continue
+            if repeats:
+                lines[-1] += f" (x{repeats + 1})"
+            lines.append(message)
+            last = message
+            repeats = 0
+        if repeats:
+            lines[-1] += f" (x{repeats + 1})"
+        if lines:
+            stream = self.stream if self.stream is not None else sys.stdout
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+
+    def close(self):
+        """
+        Write out anything still queued and stop the thread.
+        """
+        self._closing.set()
+        self._thread.join()
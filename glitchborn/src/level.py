@@ -1,121 +1,658 @@
 import pygame
 import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from platform import Platform
-from enemy import Enemy
+from enemy import Enemy, PATROL_RANGE, CHASE_RADIUS
+from spatial import SpatialGrid
+from camera import Camera
+from collision import masks_overlap
+from particles import ParticlePool, PARTICLE_KINDS, PARTICLE_CAPACITY, PROJECTILE_KINDS, PROJECTILE_CAPACITY
+from assets import asset_manager
+from profiler import profiler
+from ecs import World, TICK_MS
+from navigation import NavGraph, reachable
+from level_format import ChunkLayout, LevelFile, LevelFormatError, write_level
+from systems import (history_system, attack_system, gravity_system, movement_system, patrol_system, chase_system,
+                     index_system, render_system)
+
+# --- Constants ---
+DRAW_MARGIN = 64 # Extra pixels around the viewport that still get drawn
+UPDATE_MARGIN = 400 # Enemies further than this outside the viewport are frozen
+
+# --- Streaming ---
+CHUNK_WIDTH = 1024
+LEVEL_CHUNKS = 36 # About as long as the old 100-platform level; None means endless
+LOAD_DISTANCE = 1024 # Chunks this close to the viewport are generated
+EVICT_DISTANCE = 3072 # Chunks further than this from the viewport are dropped
+
+# --- Generation Parameters ---
+MIN_WIDTH, MAX_WIDTH = 150, 300
+MIN_GAP, MAX_GAP = 80, 200
+MIN_Y, MAX_Y = 250, 500
+MAX_Y_CHANGE = 80
+PLATFORM_HEIGHT = 30 # Standard platform height
+ENEMY_SPAWN_CHANCE = 0.3
+# Platforms stop this far from the chunk edge, so any gap across a chunk
+# boundary stays within MIN_GAP..MAX_GAP
+CHUNK_EDGE_GAP = MIN_GAP // 2
+# The first platform of every chunk sits in this band, so neighbouring chunks
+# can always be joined within MAX_Y_CHANGE
+ENTRY_MIN_Y = (MIN_Y + MAX_Y - MAX_Y_CHANGE) // 2
+ENTRY_MAX_Y = ENTRY_MIN_Y + MAX_Y_CHANGE
+GROUND_LENGTH = 5000 # The ground only runs under the start of the level
+GROUND_Y = 536 # Bottom of the screen (600 - 64)
+BACKGROUND_IMAGE = "bg1.png"
+GROUND_TILE_IMAGE = "groundtile.png"
+LEVEL_ASSETS = [BACKGROUND_IMAGE, GROUND_TILE_IMAGE]
+STATIC_COLORKEY = (255, 0, 255) # Magenta marks the see-through parts of baked chunks
+
+# Generates chunk layouts ahead of the camera, and whole levels before they
+# are played, off the main thread
+_generator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-gen")
+
+class Chunk:
+    """
+    One CHUNK_WIDTH-wide slice of the level and the sprites generated for it.
+    Every enemy spawn gets a sprite, defeated or not, so restoring a
+    checkpoint can bring them back; only the living ones are in the level.
+    """
+    def __init__(self, index):
+        """
+        Initialize an empty chunk.
+        """
+        self.index = index
+        self.platforms = []
+        self.enemies = []
+        # The chunk's platforms baked into one surface, and where it goes in
+        # the world; None until the chunk is first drawn or after invalidation
+        self.surface = None
+        self.bounds = None
 
 class Level:
     """
-    This class represents a single level. It creates all the platforms and other
-    objects for the level.
+    This class represents a single level. The level is split into chunks that
+    are generated as the camera approaches them and evicted once it has moved
+    far away. Every chunk is seeded from the level seed and its index, so an
+    evicted chunk comes back exactly as it was.
     """
-    def __init__(self):
+    def __init__(self, seed=None, chunk_count=LEVEL_CHUNKS, draw_margin=DRAW_MARGIN, update_margin=UPDATE_MARGIN,
+                 load_distance=LOAD_DISTANCE, evict_distance=EVICT_DISTANCE, tick_ms=TICK_MS, background=False,
+                 source=None):
         """
-        Initialize the level.
+        Initialize the level. With background=True the starting chunks are
+        generated on a worker thread and nothing is built until the first
+        stream(); poll progress or call wait() before using the level.
+        source is an optional LevelFile to read chunks from instead of
+        generating them; see Level.load().
         """
         self.platform_list = pygame.sprite.Group()
         self.enemy_list = pygame.sprite.Group()
-        self.world_shift = 0
-        self.background_x = 0
-
-        # Load background
-        try:
-            self.background_image = pygame.image.load("glitchborn/assets/bg1.png").convert()
-        except (pygame.error, FileNotFoundError):
-            self.background_image = pygame.Surface([800, 600])
-            self.background_image.fill((100, 100, 100)) # Gray placeholder
-
-        # Load ground tile
-        try:
-            ground_tile_image = pygame.image.load("glitchborn/assets/groundtile.png").convert()
-        except (pygame.error, FileNotFoundError):
-            ground_tile_image = pygame.Surface([64, 64])
-            ground_tile_image.fill((0, 255, 0)) # Green placeholder
-
-        # Ground platform - we can make this longer for a longer level
-        ground = Platform(5000, 64, tile_image=ground_tile_image)
-        ground.rect.x = 0
-        ground.rect.y = 536 # Place ground at the bottom of the screen (600 - 64)
-        self.platform_list.add(ground)
-
-        # Generate the rest of the level
-        self._generate_level()
-
-    def _generate_level(self):
-        """
-        Procedurally generates the platforms and enemies for the level.
-        """
-        # --- Generation Parameters ---
-        PLATFORM_COUNT = 100
-        MIN_WIDTH, MAX_WIDTH = 150, 300
-        MIN_GAP, MAX_GAP = 80, 200
-        MIN_Y, MAX_Y = 250, 500
-        MAX_Y_CHANGE = 80
-
-        last_x = 200
-        last_y = 500
-
-        for _ in range(PLATFORM_COUNT):
-            width = random.randint(MIN_WIDTH, MAX_WIDTH)
-            height = 30 # Standard platform height
-
-            # Calculate new position
-            gap = random.randint(MIN_GAP, MAX_GAP)
-            x = last_x + gap
-
-            y_change = random.randint(-MAX_Y_CHANGE, MAX_Y_CHANGE)
-            y = last_y + y_change
-
-            # Clamp y-position to ensure level is traversable
-            y = max(MIN_Y, min(y, MAX_Y))
-
-            # Create and add the platform
-            platform = Platform(width, height)
+        # Broadphase index over platform_list
+        self.platform_grid = SpatialGrid()
+        # Enemies are indexed by where they are now; index_system re-buckets
+        # the ones that patrolled into different cells after every tick
+        self.enemy_grid = SpatialGrid()
+        # The level's entities (platforms, enemies and the player) and the
+        # systems that simulate them in batches, in the order they run
+        self.world = World()
+        for system in (history_system, attack_system, gravity_system, movement_system, patrol_system, chase_system):
+            self.world.add_system(system)
+        self.tick_ms = tick_ms
+        # All sprites stay in world coordinates; the camera offsets them when drawn
+        self.camera = Camera()
+
+        # --- Culling ---
+        self.draw_margin = draw_margin
+        self.update_margin = update_margin
+
+        # --- Streaming ---
+        self.source = source
+        if source is not None:
+            seed = source.seed
+            chunk_count = source.chunk_count
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.chunk_count = chunk_count
+        self.load_distance = load_distance
+        self.evict_distance = max(evict_distance, load_distance)
+        self.chunks = {}
+        self._stream_window = None
+        # Layouts generated ahead of time, by chunk index: a ChunkLayout, or
+        # a Future while it is still being generated in the background
+        self.layouts = {}
+        self._layouts_lock = threading.Lock()
+        # Spawn ids of defeated enemies, so regenerated chunks leave them out
+        self.killed_enemies = set()
+        # Which platform can be reached from which, for chasing enemies; it
+        # grows and shrinks with the loaded chunks
+        self.nav = NavGraph(CHUNK_WIDTH)
+        self.player = None
+        self.player_node = None # The platform the player last stood on
+        # Effects and projectiles, in world coordinates like everything else
+        self.particles = ParticlePool(PARTICLE_KINDS, PARTICLE_CAPACITY, seed=self.seed)
+        self.projectiles = ParticlePool(PROJECTILE_KINDS, PROJECTILE_CAPACITY)
+
+        # Load background and ground tile, with placeholders if they are missing
+        self.background_image = asset_manager.image(BACKGROUND_IMAGE, fallback=((800, 600), (100, 100, 100))) # Gray placeholder
+        self.ground_tile_image = asset_manager.image(GROUND_TILE_IMAGE, fallback=((64, 64), (0, 255, 0))) # Green placeholder
+
+        # Generate the chunks around the starting view
+        first, last = self._chunk_range(self.load_distance)
+        self._start_chunks = range(first, last + 1)
+        self.prefetch(self._start_chunks, background)
+        if not background:
+            self.stream()
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """
+        Open a level saved with save() or written by level_format. The file
+        is memory-mapped and chunks are read from it as the camera reaches
+        them, so loading costs the same however large the level is. Other
+        keyword arguments are passed on to Level().
+        """
+        source = LevelFile(path)
+        if source.chunk_width != CHUNK_WIDTH:
+            source.close()
+            raise LevelFormatError(f"{path} has {source.chunk_width} pixel chunks, not {CHUNK_WIDTH}")
+        return cls(source=source, **kwargs)
+
+    def close(self):
+        """
+        Close the level file chunks are read from, if any, once the layouts
+        still being read from it on the worker thread are done.
+        """
+        if self.source is None:
+            return
+        with self._layouts_lock:
+            pending = [layout for layout in self.layouts.values() if isinstance(layout, Future)]
+        for future in pending:
+            future.cancel()
+        wait(pending)
+        self.source.close()
+
+    def save(self, path):
+        """
+        Write the level's layout (every chunk's platforms and enemy spawns)
+        to a level file. Which enemies have been defeated is game state
+        rather than layout, so every spawn is written.
+        """
+        if self.chunk_count is None:
+            raise ValueError("an endless level can't be saved")
+        write_level(path, [self._read_layout(index) for index in range(self.chunk_count)], CHUNK_WIDTH, self.seed)
+
+    def snapshot(self):
+        """
+        Return the level's state as plain values, for save games and
+        checkpoints: which level this is, where the camera is and which
+        enemies have been defeated. The layout itself is not included; it
+        comes back from the seed or the level file.
+        """
+        return {
+            'seed': self.seed,
+            'chunk_count': self.chunk_count,
+            'path': self.source.path if self.source is not None else None,
+            'camera_x': self.camera.x,
+            # Keyed by spawn id, so a save only grows by the enemies killed since the last one
+            'killed': {f"{index}:{slot}": True for index, slot in self.killed_enemies},
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot, **kwargs):
+        """
+        Create the level a snapshot was taken of, in the state it recorded.
+        """
+        if snapshot['path'] is not None:
+            level = cls.load(snapshot['path'], **kwargs)
+        else:
+            level = cls(seed=snapshot['seed'], chunk_count=snapshot['chunk_count'], **kwargs)
+        level.restore(snapshot)
+        return level
+
+    def restore(self, snapshot):
+        """
+        Return this level to the state snapshot() recorded, without
+        regenerating it: enemies defeated since then come back and the
+        camera jumps back.
+        """
+        self.killed_enemies = {tuple(int(part) for part in key.split(':')) for key in snapshot['killed']}
+        for chunk in self.chunks.values():
+            for enemy in chunk.enemies:
+                if enemy.spawn_id in self.killed_enemies:
+                    if enemy.alive():
+                        self._remove_enemy(enemy)
+                elif not enemy.alive():
+                    self.add_enemy(enemy)
+        for entity in self.world.query('chase'):
+            self.world.objects[entity].return_to_spawn()
+        self.camera.x = self.camera.prev_x = self.camera.draw_x = snapshot['camera_x']
+        self.particles.clear()
+        self.projectiles.clear()
+        self.stream()
+
+    def _read_layout(self, index):
+        """
+        Return a chunk's layout from the level file, or generate it.
+        """
+        if self.source is not None:
+            return self.source.read_chunk(index)
+        return self._generate_layout(index)
+
+    def _entry_y(self, index):
+        """
+        The height of the first platform in a chunk.
+        """
+        return random.Random(f"{self.seed}:{index}:entry").randint(ENTRY_MIN_Y, ENTRY_MAX_Y)
+
+    def _generate_layout(self, index):
+        """
+        Procedurally generates the platforms and enemies for one chunk. The
+        result only depends on the level seed and the chunk index, and
+        creates no sprites, so it is safe to run on a worker thread.
+        """
+        layout = ChunkLayout(index)
+        rng = random.Random(f"{self.seed}:{index}")
+        left = index * CHUNK_WIDTH
+        end = left + CHUNK_WIDTH - CHUNK_EDGE_GAP
+
+        # Ground segment for the part of this chunk under the start of the level
+        ground_width = min(end + CHUNK_EDGE_GAP, GROUND_LENGTH) - left
+        if ground_width > 0:
+            layout.platforms.append((left, GROUND_Y, ground_width, 64, True))
+
+        next_entry_y = self._entry_y(index + 1)
+        if index == 0:
+            x = 200 + rng.randint(MIN_GAP, MAX_GAP)
+        else:
+            x = left + rng.randint(MIN_GAP - CHUNK_EDGE_GAP, MAX_GAP - CHUNK_EDGE_GAP)
+        y = self._entry_y(index)
+        first = True
+        previous = None
+
+        while True:
+            width = rng.randint(MIN_WIDTH, MAX_WIDTH)
+            gap = rng.randint(MIN_GAP, MAX_GAP)
+            y_change = rng.randint(-MAX_Y_CHANGE, MAX_Y_CHANGE)
+
+            # If there is no room for another platform after this one, stretch
+            # it up to the chunk edge so the gap into the next chunk is short
+            last = x + width + gap + MIN_WIDTH > end
+            if last:
+                width = end - x
+
+            if not first:
+                y += y_change
+                # Clamp y-position to ensure level is traversable, and keep
+                # enough steps in hand to reach the next chunk's entry height
+                steps_left = (end - x - width) // (MAX_WIDTH + MAX_GAP) + 1
+                y = max(MIN_Y, min(y, MAX_Y))
+                y = max(next_entry_y - MAX_Y_CHANGE * steps_left, min(y, next_entry_y + MAX_Y_CHANGE * steps_left))
+                # Never leave a platform the player can't jump to from the last one
+                if not reachable(previous, (x, y, width, PLATFORM_HEIGHT)):
+                    y = previous[1]
+            first = False
+
+            # Create the platform
+            previous = (x, y, width, PLATFORM_HEIGHT)
+            layout.platforms.append(previous + (False,))
+
+            # --- Optional: Spawn an enemy on this platform ---
+            spawn_id = (index, len(layout.platforms))
+            if rng.random() < ENEMY_SPAWN_CHANCE:
+                layout.enemies.append((x + 20, y - 32, PATROL_RANGE, spawn_id)) # 32 is ENEMY_HEIGHT
+
+            if last:
+                break
+            x += width + gap
+
+        return layout
+
+    def _build_chunk(self, layout):
+        """
+        Create the sprites for a generated layout.
+        """
+        chunk = Chunk(layout.index)
+        for x, y, width, height, ground in layout.platforms:
+            platform = Platform(width, height, tile_image=self.ground_tile_image if ground else None)
             platform.rect.x = x
             platform.rect.y = y
-            self.platform_list.add(platform)
+            chunk.platforms.append(platform)
+        for x, y, patrol_range, spawn_id in layout.enemies:
+            chunk.enemies.append(Enemy(x, y, patrol_range, spawn_id))
+        return chunk
 
-            # Update for next iteration
-            last_x = platform.rect.right
-            last_y = platform.rect.y
+    def prefetch(self, indices, background=True):
+        """
+        Generate the layouts of the given chunks ahead of time, on the
+        level-generation worker thread unless background is False.
+        """
+        with self._layouts_lock:
+            indices = [index for index in indices
+                       if index not in self.layouts and index not in self.chunks
+                       and index >= 0 and (self.chunk_count is None or index < self.chunk_count)]
+            for index in indices:
+                if background:
+                    self.layouts[index] = _generator.submit(self._read_layout, index)
+                else:
+                    self.layouts[index] = self._read_layout(index)
 
-            # --- Optional: Spawn an enemy on this platform ---
-            ENEMY_SPAWN_CHANCE = 0.3
-            if random.random() < ENEMY_SPAWN_CHANCE:
-                enemy = Enemy(platform.rect.x + 20, platform.rect.y - 32) # 32 is ENEMY_HEIGHT
-                self.enemy_list.add(enemy)
+    def _layout(self, index):
+        """
+        Return the layout of a chunk, waiting for it if it is being
+        generated in the background and generating it now if it was never
+        prefetched.
+        """
+        with self._layouts_lock:
+            layout = self.layouts.pop(index, None)
+        if layout is None:
+            return self._read_layout(index)
+        if isinstance(layout, Future):
+            return layout.result()
+        return layout
 
-    def shift_world(self, shift_x):
+    @property
+    def progress(self):
+        """
+        Fraction of the starting chunks generated so far, from 0.0 to 1.0.
+        """
+        with self._layouts_lock:
+            pending = sum(1 for index in self._start_chunks
+                          if isinstance(self.layouts.get(index), Future) and not self.layouts[index].done())
+        return 1.0 - pending / max(len(self._start_chunks), 1)
+
+    def wait(self):
         """
-        Shift the world left or right.
+        Block until the starting chunks are generated, then build them.
         """
-        self.world_shift += shift_x
-        self.background_x += shift_x * 0.5
+        self.stream()
 
-        for platform in self.platform_list:
-            platform.rect.x += shift_x
-        for enemy in self.enemy_list:
-            enemy.rect.x += shift_x
+    @property
+    def width(self):
+        """
+        The length of the level in pixels, or None for an endless level.
+        """
+        if self.chunk_count is None:
+            return None
+        return self.chunk_count * CHUNK_WIDTH
+
+    def _chunk_range(self, distance):
+        """
+        Return the first and last chunk index within distance of the viewport.
+        """
+        view = self.camera.view_rect
+        first = max(0, (view.left - distance) // CHUNK_WIDTH)
+        last = (view.right + distance) // CHUNK_WIDTH
+        if self.chunk_count is not None:
+            last = min(last, self.chunk_count - 1)
+        return first, last
+
+    def stream(self):
+        """
+        Generate the chunks the camera is approaching and evict the ones it
+        has left far behind.
+        """
+        # Nothing to do until the camera crosses into a different chunk window
+        window = (self._chunk_range(self.evict_distance), self._chunk_range(self.load_distance))
+        if window == self._stream_window:
+            return
+        self._stream_window = window
+
+        keep_first, keep_last = self._chunk_range(self.evict_distance)
+        for index in [i for i in self.chunks if i < keep_first or i > keep_last]:
+            self._unload_chunk(self.chunks.pop(index))
+        with self._layouts_lock:
+            for index in [i for i in self.layouts if i < keep_first or i > keep_last]:
+                del self.layouts[index]
+
+        load_first, load_last = self._chunk_range(self.load_distance)
+        for index in range(load_first, load_last + 1):
+            if index not in self.chunks:
+                self.chunks[index] = self._load_chunk(index)
+
+        # Have the next chunk on either side ready before the camera gets there
+        self.prefetch([load_first - 1, load_last + 1])
+
+    def _load_chunk(self, index):
+        """
+        Build a chunk, add its sprites to the level (leaving out enemies
+        that have already been defeated) and its platforms to the navigation
+        graph.
+        """
+        layout = self._layout(index)
+        chunk = self._build_chunk(layout)
+        self.nav.add_chunk(layout)
+        for platform in chunk.platforms:
+            self.add_platform(platform)
+        for enemy in chunk.enemies:
+            if enemy.spawn_id not in self.killed_enemies:
+                self.add_enemy(enemy)
+        return chunk
+
+    def _unload_chunk(self, chunk):
+        """
+        Remove a chunk's sprites from the level and the navigation graph.
+        """
+        self.nav.remove_chunk(chunk.index)
+        for platform in chunk.platforms:
+            platform.kill()
+            self.platform_grid.remove(platform)
+            self.world.detach(platform)
+        for enemy in chunk.enemies:
+            if enemy.alive():
+                self._remove_enemy(enemy)
+
+    def add_platform(self, platform):
+        """
+        Add a platform to the level and index it for collision queries.
+        """
+        self.platform_list.add(platform)
+        self.platform_grid.insert(platform)
+        self.world.attach(platform, **platform.components)
+
+    def platforms_colliding(self, rect):
+        """
+        Return the platforms overlapping rect (in world coordinates), looking
+        only at the grid cells around it instead of the whole platform list.
+        """
+        candidates = self.platform_grid.query(rect)
+        return [platform for platform in candidates if rect.colliderect(platform.rect)]
+
+    def add_enemy(self, enemy):
+        """
+        Add an enemy to the level and index it for queries.
+        """
+        enemy.level = self
+        self.enemy_list.add(enemy)
+        self.enemy_grid.insert(enemy)
+        self.world.attach(enemy, **enemy.components)
+        left, top, right, bottom = self.enemy_grid.cell_span(enemy.rect)
+        self.world.add_component(enemy.entity, 'indexed', left=left, top=top, right=right, bottom=bottom)
+
+    def _remove_enemy(self, enemy):
+        """
+        Take an enemy out of the level, keeping its last position in its rect.
+        A chaser goes back to its spawn, so it comes back as generated.
+        """
+        if enemy.chasing:
+            enemy.return_to_spawn()
+        enemy.kill()
+        self.enemy_grid.remove(enemy)
+        enemy.update()
+        self.world.detach(enemy)
+
+    def kill_enemy(self, enemy):
+        """
+        Remove a defeated enemy from the level.
+        """
+        self._remove_enemy(enemy)
+        self.killed_enemies.add(enemy.spawn_id)
+
+    def add_player(self, player):
+        """
+        Put the player into this level, taking it out of any previous one.
+        """
+        if player.level is not None:
+            player.level.world.detach(player)
+        player.level = self
+        self.player = player
+        self.player_node = None
+        self.world.attach(player, **player.components)
+
+    def enemies_colliding(self, rect, mask=None):
+        """
+        Return the enemies overlapping rect (in world coordinates), looking
+        only at the grid cells around it instead of the whole enemy list.
+        With a mask for rect, enemies whose rects overlap are then checked
+        pixel by pixel against their own masks.
+        """
+        candidates = self.enemy_grid.query(rect)
+        # Far-off enemies' rects go stale while they patrol; bring these up to date
+        for enemy in candidates:
+            enemy.update()
+        hits = [enemy for enemy in candidates if rect.colliderect(enemy.rect)]
+        if mask is not None:
+            hits = [enemy for enemy in hits if masks_overlap(rect, mask, enemy.rect, enemy.mask)]
+        return hits
+
+    @property
+    def world_shift(self):
+        """
+        How far the world has scrolled right relative to the screen.
+        """
+        return -self.camera.x
+
+    def shift_world(self, shift_x):
+        """
+        Shift the world left or right. Only the camera moves; sprites keep
+        their world coordinates.
+        """
+        self.camera.scroll(-shift_x)
 
     def draw(self, screen):
         """
         Draw all the sprites in the level.
         """
+        self.draw_static(screen)
+        self.draw_dynamic(screen)
+
+    def _bake_chunk(self, chunk):
+        """
+        Render a chunk's platforms into a single surface, so drawing the
+        chunk is one blit instead of one per platform.
+        """
+        bounds = chunk.platforms[0].rect.unionall([platform.rect for platform in chunk.platforms[1:]])
+        surface = pygame.Surface(bounds.size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(STATIC_COLORKEY)
+        surface.set_colorkey(STATIC_COLORKEY, pygame.RLEACCEL)
+        surface.blits([(platform.image, platform.rect.move(-bounds.x, -bounds.y)) for platform in chunk.platforms], False)
+        chunk.surface = surface
+        chunk.bounds = bounds
+
+    def invalidate_chunk(self, index):
+        """
+        Throw away a chunk's baked surface so it is rebuilt the next time it
+        is drawn, e.g. after its platforms change.
+        """
+        chunk = self.chunks.get(index)
+        if chunk is not None:
+            chunk.surface = None
+            chunk.bounds = None
+
+    def draw_static(self, screen):
+        """
+        Draw the parts of the level that only change when the camera moves:
+        the background and the platforms. Platforms are drawn as one baked
+        surface per visible chunk.
+        """
         # Draw the background
         bg_width = self.background_image.get_width()
-        # Calculate the position of the first background image
-        bg1_x = self.background_x % bg_width
+        # Calculate the position of the first background image; it scrolls
+        # at half the speed of the world
+        bg1_x = (-self.camera.draw_x * 0.5) % bg_width
         # Calculate the position of the second background image
         bg2_x = bg1_x - bg_width
         # Draw the two background images
         screen.blit(self.background_image, (bg1_x, 0))
         screen.blit(self.background_image, (bg2_x, 0))
 
-        self.platform_list.draw(screen)
-        self.enemy_list.draw(screen)
+        # Only blit the chunks that are (nearly) on screen
+        with profiler.section('level.draw'):
+            view = self.camera.view_rect.inflate(self.draw_margin * 2, self.draw_margin * 2)
+            first = view.left // CHUNK_WIDTH
+            last = view.right // CHUNK_WIDTH
+            blits = []
+            for index, chunk in self.chunks.items():
+                if index < first - 1 or index > last + 1:
+                    # Keep memory bounded: only chunks around the view stay baked
+                    chunk.surface = None
+                    chunk.bounds = None
+                    continue
+                if index < first or index > last or not chunk.platforms:
+                    # Hand-made levels can have chunks with no platforms at all
+                    continue
+                if chunk.surface is None:
+                    self._bake_chunk(chunk)
+                if view.colliderect(chunk.bounds):
+                    blits.append((chunk.surface, self.camera.draw_rect(chunk.bounds)))
+            screen.blits(blits, False)
+        profiler.count('static_blits', len(blits))
+
+    def _wake_chasers(self):
+        """
+        Start the enemies near the player chasing it, if the navigation graph
+        has a way from their platform to the player's.
+        """
+        player = self.player
+        if player is None:
+            return
+        node = self.nav.node_at(player.rect.centerx, player.rect.bottom)
+        if node is not None:
+            self.player_node = node
+        if self.player_node is None:
+            return
+        for enemy in self.enemy_grid.query(player.rect.inflate(CHASE_RADIUS * 2, CHASE_RADIUS * 2)):
+            if enemy.chasing:
+                continue
+            enemy.update()
+            start = self.nav.node_at(enemy.rect.centerx, enemy.rect.bottom)
+            if start is not None and self.nav.path(start, self.player_node) is not None:
+                enemy.start_chase(start)
+
+    def draw_dynamic(self, screen, alpha=1.0):
+        """
+        Draw the parts of the level that move on their own (the enemies,
+        effects and projectiles) alpha of the way between the previous tick
+        and the current one, and return the screen rects that were drawn to.
+        """
+        with profiler.section('level.draw'):
+            view = self.camera.view_rect.inflate(self.draw_margin * 2, self.draw_margin * 2)
+            rects = render_system(self.world, screen, self.camera, view, alpha)
+        profiler.count('sprites_drawn', len(rects))
+        with profiler.section('particles.draw'):
+            rects.extend(self.particles.draw(screen, self.camera, view, alpha))
+            rects.extend(self.projectiles.draw(screen, self.camera, view, alpha))
+        return rects
 
     def update(self):
         """
-        Update everything in this level.
+        Update everything in this level by one tick. The world's systems
+        advance every entity in batches; only the enemies near the viewport
+        have their sprite rects brought up to date.
         """
-        self.platform_list.update()
-        self.enemy_list.update()
+        self.stream()
+        self.world.update(self.tick_ms)
+        index_system(self.world, self.enemy_grid)
+
+        view = self.camera.view_rect.inflate(self.update_margin * 2, self.update_margin * 2)
+        enemies = self.enemy_grid.query(view)
+        for enemy in enemies:
+            enemy.update()
+        profiler.count('sprites_updated', len(enemies))
+        self._wake_chasers()
+
+        with profiler.section('particles'):
+            self.particles.update(self.tick_ms)
+            self.projectiles.update(self.tick_ms)
+        profiler.count('particles', len(self.particles))
@@ -0,0 +1,129 @@
+"""
+Compact binary level files.
+
+A level file is a fixed header, a table with one entry per chunk, and the
+chunks' platform and enemy records, all little-endian:
+
+    header       magic b"GBLV", version, chunk width, chunk count, seed
+    chunk table  per chunk: file offset of its records, platform count,
+                 enemy count
+    records      per chunk: its platforms (x, y, width, height, kind)
+                 followed by its enemies (x, y, patrol range, spawn slot)
+
+Every record has a fixed size, so a reader can find any chunk from the
+table alone. LevelFile memory-maps the file and only decodes the chunks it
+is asked for, which keeps opening even a huge level to a few microseconds.
+"""
+import mmap
+import os
+import struct
+
+# --- Constants ---
+MAGIC = b"GBLV"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxIIQ") # magic, version, chunk width, chunk count, seed
+CHUNK_ENTRY = struct.Struct("<QII") # records offset, platform count, enemy count
+PLATFORM_RECORD = struct.Struct("<iiHHB") # x, y, width, height, kind
+ENEMY_RECORD = struct.Struct("<iiHH") # x, y, patrol range, spawn slot
+KIND_PLATFORM = 0
+KIND_GROUND = 1
+
+class ChunkLayout:
+    """
+    The generated contents of one chunk as plain data, so it can be produced
+    on a worker thread or stored in a level file: platforms as
+    (x, y, width, height, ground) and enemies as
+    (x, y, patrol_range, spawn_id).
+    """
+    def __init__(self, index):
+        """
+        Initialize an empty layout.
+        """
+        self.index = index
+        self.platforms = []
+        self.enemies = []
+
+class LevelFormatError(ValueError):
+    """
+    Raised when a file is not a level file this version can read.
+    """
+
+def write_level(path, layouts, chunk_width, seed=0):
+    """
+    Write a level file from a list of ChunkLayouts, one per chunk index
+    starting at 0.
+    """
+    table_end = HEADER.size + CHUNK_ENTRY.size * len(layouts)
+    table = bytearray()
+    records = bytearray()
+    for index, layout in enumerate(layouts):
+        if layout.index != index:
+            raise ValueError(f"layout {layout.index} is at position {index}")
+        table += CHUNK_ENTRY.pack(table_end + len(records), len(layout.platforms), len(layout.enemies))
+        for x, y, width, height, ground in layout.platforms:
+            records += PLATFORM_RECORD.pack(x, y, width, height, KIND_GROUND if ground else KIND_PLATFORM)
+        for x, y, patrol_range, (_, slot) in layout.enemies:
+            records += ENEMY_RECORD.pack(x, y, patrol_range, slot)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, chunk_width, len(layouts), seed))
+        f.write(table)
+        f.write(records)
+
+class LevelFile:
+    """
+    A memory-mapped level file. Only the header is read up front;
+    read_chunk() seeks straight to one chunk's records through the chunk
+    table.
+    """
+    def __init__(self, path):
+        """
+        Open and map a level file.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise LevelFormatError(f"{path} is too short to be a level file")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.chunk_width, self.chunk_count, self.seed = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise LevelFormatError(f"{path} is not a version {VERSION} level file")
+        if len(self._map) < HEADER.size + CHUNK_ENTRY.size * self.chunk_count:
+            self.close()
+            raise LevelFormatError(f"{path} is truncated")
+
+    def read_chunk(self, index):
+        """
+        Decode one chunk into a ChunkLayout.
+        """
+        if not 0 <= index < self.chunk_count:
+            raise IndexError(f"chunk {index} is outside the level")
+        offset, platform_count, enemy_count = CHUNK_ENTRY.unpack_from(self._map, HEADER.size + CHUNK_ENTRY.size * index)
+        layout = ChunkLayout(index)
+        if offset + PLATFORM_RECORD.size * platform_count + ENEMY_RECORD.size * enemy_count > len(self._map):
+            raise LevelFormatError(f"{self.path}: chunk {index} runs past the end of the file")
+        end = offset + PLATFORM_RECORD.size * platform_count
+        for x, y, width, height, kind in PLATFORM_RECORD.iter_unpack(self._map[offset:end]):
+            layout.platforms.append((x, y, width, height, kind == KIND_GROUND))
+        offset, end = end, end + ENEMY_RECORD.size * enemy_count
+        for x, y, patrol_range, slot in ENEMY_RECORD.iter_unpack(self._map[offset:end]):
+            layout.enemies.append((x, y, patrol_range, (index, slot)))
+        return layout
+
+    def close(self):
+        """
+        Unmap the file.
+        """
+        self._map.close()
+
+    def __enter__(self):
+        """
+        Use the file as a context manager that closes it on exit.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Close the file.
+        """
+        self.close()
@@ -1,8 +1,18 @@
+import argparse
+import math
+import os
 import pygame
 import random
-from player import Player
-from level import Level
+from player import Player, PLAYER_FRAMES, PLAYER_COLORKEY
+from level import Level, LEVEL_ASSETS
 from enemy import Enemy
+from assets import asset_manager, TextCache
+from controls import KeyboardInput, RecordingInput
+from profiler import profiler, OVERLAY_FONT_SIZE
+from renderer import DirtyRectRenderer
+from savegame import Autosaver, read_save
+from replay import write_replay
+from events import EventBus, LogSink, Hit, Kill, ItemDropped, ItemPickedUp, StatChanged
 
 # --- Constants ---
 SCREEN_WIDTH = 800
@@ -11,43 +21,234 @@ TITLE = "Glitchborn"
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 GREEN = (0, 255, 0)
-FPS = 60
+FPS = 60 # Display frame rate cap
+TICK_RATE = 60 # Simulation ticks per second; movement constants are per 1/60 s and scaled to the tick
+MAX_CATCHUP_STEPS = 5 # Most ticks simulated in one frame before dropping time
 FONT_NAME = 'sans-serif'
+OVERLAY_KEY = pygame.K_F3 # Toggles the profiling overlay
+TRACE_KEY = pygame.K_F4 # Starts/stops recording a per-frame trace
+TRACE_PATH = "frame_trace.csv" # Where F4 writes its trace (.json for JSON)
+AUTOSAVE_TICKS = 600 # Ticks between autosaves when saving is enabled
+HIT_SPARKS = 12 # Particles thrown by an enemy touching the player or a shot hitting a wall
+DEATH_BURST = 60 # Particles thrown by a killed enemy
 
 class Game:
     """
     Main game class.
     """
-    def __init__(self):
+    def __init__(self, tick_rate=TICK_RATE, fps=FPS, headless=False, seed=None, input_source=None, trace_path=None,
+                 dirty_rects=False, level_path=None, save_path=None, start=None, record_path=None):
         """
-        Initialize the game.
+        Initialize the game. A headless game renders into an off-screen
+        surface (no window, no display.flip); input_source replaces the
+        keyboard, e.g. with a controls.ScriptedInput; seed makes the level
+        layout, XP rolls and item drops reproducible; trace_path records a
+        per-frame profiling trace from the start and writes it on quit;
+        dirty_rects switches to a renderer that only repaints what changed
+        while the camera is still; level_path starts on a saved level file
+        instead of a generated level; save_path resumes from that save game
+        if it exists and autosaves to it in the background; start resumes
+        from a snapshot dict instead; record_path records the session to
+        that file on quit, for replay.py.
         """
+        self.headless = headless
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption(TITLE)
         self.clock = pygame.time.Clock()
         self.running = True
+        self.fps = fps
+        self.tick_rate = tick_rate
+        self.tick_ms = 1000 / tick_rate
+        # All gameplay randomness comes from here, so a seed replays exactly.
+        # Without one a seed is still picked, so the session can be recorded
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.input = input_source if input_source is not None else KeyboardInput()
+        self.record_path = record_path
+        if record_path is not None:
+            self.input = RecordingInput(self.input)
+        self.trace_path = trace_path or TRACE_PATH
+        if trace_path:
+            profiler.start_trace()
         self.game_state = 'playing' # Can be 'playing', 'character_screen', 'inventory_screen'
         self.font_name = pygame.font.match_font(FONT_NAME)
+        self.text = TextCache(self.font_name)
+        # Built once; the character screen blits it every frame it is open
+        self.menu_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.menu_overlay.fill((0, 0, 0, 180)) # Black with 180/255 alpha
+        self.renderer = DirtyRectRenderer(self.screen, headless) if dirty_rects else None
         self.all_sprites = pygame.sprite.Group()
-        self.level = Level()
+
+        # Gameplay reports what happens on the bus; the rules that react to it
+        # subscribe here, and the console log is written off the game thread
+        self.bus = EventBus()
+        self.bus.subscribe(Kill, self.award_kill_xp)
+        self.bus.subscribe(Kill, self.roll_item_drop)
+        self.bus.subscribe(Kill, self.spawn_death_burst)
+        self.bus.subscribe(Hit, self.spawn_hit_sparks)
+        self.bus.subscribe(ItemDropped, self.spawn_pickup)
+        self.log = LogSink()
+        self.bus.subscribe(None, self.log)
+
+        # Decode every asset on a worker thread while the loading screen shows,
+        # then pack the player's frames into one atlas
+        asset_manager.preload(PLAYER_FRAMES + LEVEL_ASSETS, background=not headless)
+        if not headless:
+            self.show_loading_screen(lambda: asset_manager.progress)
+        asset_manager.wait()
+        asset_manager.pack_atlas(PLAYER_FRAMES, colorkey=PLAYER_COLORKEY)
+
+        # Likewise generate the first level's starting chunks on a worker thread
+        seed = self.rng.randrange(2 ** 32)
+        saved = start
+        if saved is None and save_path is not None and os.path.exists(save_path):
+            saved = read_save(save_path)
+        if saved is not None:
+            self.level = Level.from_snapshot(saved['level'], tick_ms=self.tick_ms)
+        elif level_path is not None:
+            self.level = Level.load(level_path, tick_ms=self.tick_ms, background=not headless)
+        else:
+            self.level = Level(seed=seed, tick_ms=self.tick_ms, background=not headless)
+        if not headless:
+            self.show_loading_screen(lambda: self.level.progress)
+        self.level.wait()
         self.player = Player(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+        self.player.bus = self.bus
         self.stat_buttons = {}
-        self.player.level = self.level
+        self.level.add_player(self.player)
+        if saved is not None:
+            self.player.restore(saved['player'])
         self.all_sprites.add(self.player)
+        self.autosaver = Autosaver(save_path, self.log) if save_path is not None else None
+        # What a recording needs to start the session over
+        self.start = {'seed': self.seed, 'tick_rate': tick_rate, 'level_path': level_path, 'snapshot': saved}
+        self.ticks = 0
+        # Where the restart action puts the game back to
+        self.checkpoint = self.snapshot()
+        # The next level is generated in the background while this one is played
+        self.next_level = self._pregenerate_level(self.level)
 
 
+    def show_loading_screen(self, progress):
+        """
+        Draw a progress bar until progress(), the fraction of some background
+        work that has finished, reaches 1.0.
+        """
+        bar = pygame.Rect(200, SCREEN_HEIGHT // 2, SCREEN_WIDTH - 400, 20)
+        while progress() < 1.0:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.running = False
+            self.screen.fill(BLACK)
+            self.draw_text("Loading...", 30, WHITE, bar.x, bar.y - 40)
+            pygame.draw.rect(self.screen, WHITE, bar, 1)
+            pygame.draw.rect(self.screen, WHITE, (bar.x, bar.y, int(bar.width * progress()), bar.height))
+            pygame.display.flip()
+            self.clock.tick(self.fps)
+
+    def _pregenerate_level(self, level):
+        """
+        Start generating the level that follows level on the level-generation
+        thread. Returns None after an endless level, which never ends.
+        """
+        if level.width is None:
+            return None
+        seed = random.Random(f"{level.seed}:next").randrange(2 ** 32)
+        return Level(seed=seed, chunk_count=level.chunk_count, tick_ms=self.tick_ms, background=True)
+
+    def advance_level(self):
+        """
+        Move the player into the pre-generated next level, back at the start.
+        Its starting chunks have normally long been generated, so this only
+        builds their sprites.
+        """
+        level = self.next_level
+        level.wait()
+        # The player's timers (attacks, shots, animation) run on simulated
+        # time, so the new level's clock carries on from this one's
+        level.world.time = self.level.world.time
+        level.add_player(self.player)
+        self.player.rect.topleft = (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+        self.player.prev_rect = self.player.rect.copy()
+        self.player.change_y = 0
+        self.level.close()
+        self.level = level
+        self.next_level = self._pregenerate_level(level)
+        self.save_checkpoint()
+        if self.renderer is not None:
+            self.renderer.invalidate()
+
+    def snapshot(self):
+        """
+        Return the player's progression and the level's state as plain
+        values, for save games and checkpoints.
+        """
+        return {'player': self.player.snapshot(), 'level': self.level.snapshot()}
+
+    def save_checkpoint(self):
+        """
+        Remember the current state to restart from, and autosave it.
+        """
+        self.checkpoint = self.snapshot()
+        if self.autosaver is not None:
+            self.autosaver.submit(self.checkpoint)
+
+    def restart(self):
+        """
+        Put the game back to the last checkpoint. The level is restored in
+        place rather than regenerated, so this is instant.
+        """
+        self.player.restore(self.checkpoint['player'])
+        self.level.restore(self.checkpoint['level'])
+        if self.renderer is not None:
+            self.renderer.invalidate()
+
     def run(self):
         """
-        The main game loop.
+        The main game loop. The simulation advances in fixed ticks of
+        tick_ms however long each frame takes to draw, and frames are drawn
+        interpolated between the last two ticks.
         """
+        accumulator = 0.0
         while self.running:
-            self.clock.tick(FPS)
+            accumulator += self.clock.tick(self.fps)
+            profiler.begin_frame()
             self.events()
-            self.update()
-            self.draw()
+
+            steps = 0
+            while accumulator >= self.tick_ms and steps < MAX_CATCHUP_STEPS:
+                with profiler.section('update'):
+                    self.update()
+                accumulator -= self.tick_ms
+                steps += 1
+            # If we fell too far behind, drop the backlog instead of trying to
+            # catch up and falling further behind
+            if steps == MAX_CATCHUP_STEPS:
+                accumulator = min(accumulator, self.tick_ms)
+
+            with profiler.section('draw'):
+                self.draw(accumulator / self.tick_ms)
+            profiler.end_frame()
         self.quit()
 
+    def simulate(self, ticks, render=False):
+        """
+        Run a number of simulation ticks back to back, as fast as possible.
+        Used to drive a headless game from scripts and benchmarks.
+        """
+        for _ in range(ticks):
+            profiler.begin_frame()
+            self.events()
+            with profiler.section('update'):
+                self.update()
+            if render:
+                with profiler.section('draw'):
+                    self.draw()
+            profiler.end_frame()
+
     def events(self):
         """
         Handle all events.
@@ -55,104 +256,206 @@ class Game:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            self.input.handle_event(event)
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    self.player.jump()
-                if event.key == pygame.K_f:
-                    self.player.attack()
-                if event.key == pygame.K_c:
-                    if self.game_state == 'playing':
-                        self.game_state = 'character_screen'
-                    elif self.game_state == 'character_screen':
-                        self.game_state = 'playing'
+                if event.key == OVERLAY_KEY:
+                    profiler.overlay_visible = not profiler.overlay_visible
+                if event.key == TRACE_KEY:
+                    if profiler.trace is None:
+                        profiler.start_trace()
+                    else:
+                        profiler.dump_trace(self.trace_path)
             if event.type == pygame.MOUSEBUTTONUP:
                 if self.game_state == 'character_screen':
                     pos = pygame.mouse.get_pos()
                     for stat_name, button_rect in self.stat_buttons.items():
                         if button_rect.collidepoint(pos):
-                            if self.player.available_stat_points > 0:
-                                self.player.available_stat_points -= 1
-                                current_value = getattr(self.player, stat_name.lower())
-                                setattr(self.player, stat_name.lower(), current_value + 1)
-                                print(f"Increased {stat_name} to {getattr(self.player, stat_name.lower())}")
-                                break # Process one click at a time
+                            # Spent on the next tick, like any other input
+                            self.input.queue_stat(stat_name.lower())
+                            break # Process one click at a time
+
+    def raise_stat(self, stat):
+        """
+        Spend one of the player's stat points on a stat.
+        """
+        if self.player.available_stat_points > 0:
+            self.player.available_stat_points -= 1
+            setattr(self.player, stat, getattr(self.player, stat) + 1)
+            self.bus.publish(StatChanged(stat, getattr(self.player, stat)))
+            if self.renderer is not None:
+                self.renderer.invalidate()
 
     def update(self):
         """
-        Update the game state.
+        Update the game state by one simulation tick.
         """
+        self.bus.begin_tick()
+        actions = self.input.next_tick()
+        if actions.character_screen:
+            if self.game_state == 'playing':
+                self.game_state = 'character_screen'
+            elif self.game_state == 'character_screen':
+                self.game_state = 'playing'
+        if actions.raise_stat is not None and self.game_state == 'character_screen':
+            self.raise_stat(actions.raise_stat)
+        if actions.checkpoint:
+            self.save_checkpoint()
+        if actions.restart:
+            self.restart()
+
         if self.game_state == 'playing':
+            self.level.camera.begin_tick()
+            self.player.controls = actions
+            if actions.jump:
+                self.player.jump()
+            if actions.attack:
+                self.player.attack()
+            if actions.shoot:
+                self.player.shoot()
             self.all_sprites.update()
             self.level.update()
 
             # --- Side-scrolling logic ---
+            # The player stays in world coordinates; we only move the camera.
+            player_screen_rect = self.level.camera.apply(self.player.rect)
             # If the player gets near the right side, shift the world left (-x)
-            if self.player.rect.right > SCREEN_WIDTH - 200:
-                shift = self.player.rect.right - (SCREEN_WIDTH - 200)
-                self.player.rect.right = SCREEN_WIDTH - 200
-                self.level.shift_world(-shift)
+            if player_screen_rect.right > SCREEN_WIDTH - 200:
+                self.level.shift_world(-(player_screen_rect.right - (SCREEN_WIDTH - 200)))
 
             # If the player gets near the left side, shift the world right (+x)
-            if self.player.rect.left < 200:
-                shift = 200 - self.player.rect.left
-                self.player.rect.left = 200
-                self.level.shift_world(shift)
-
-            # --- Attack collision ---
-            if self.player.attacking:
-                # The attack_rect is in screen coordinates. The enemy rects are in world coordinates.
-                # We need to check for collision in the same coordinate system.
-                # We can check by creating a temporary rect for the enemy in screen coordinates.
-                for enemy in self.level.enemy_list:
-                    # The world_shift is the offset of the world relative to the screen.
-                    # A positive world_shift means the world has moved right (player went left).
-                    # So, screen_x = world_x + world_shift
-                    enemy_screen_rect = enemy.rect.move(self.level.world_shift, 0)
-                    if self.player.attack_rect.colliderect(enemy_screen_rect):
-                        xp = random.randint(enemy.xp_reward[0], enemy.xp_reward[1])
-                        self.player.add_xp(xp)
-                        enemy.kill()
-                        # Item drop logic
-                        if random.random() < 0.5: # 50% drop chance
-                            print("Enemy dropped an item!")
-
-            # --- Player-enemy collision ---
-            # Only check for player-enemy collision if the player is not attacking.
-            if not self.player.attacking:
-                enemy_hit_list = pygame.sprite.spritecollide(self.player, self.level.enemy_list, False)
-                if enemy_hit_list:
-                    # For now, just print a message
-                    print("Player hit an enemy!")
-                    # We could end the game here, or reduce player health, etc.
-
-    def draw_text(self, text, size, color, x, y):
-        """
-        Helper function to draw text on the screen.
-        """
-        font = pygame.font.Font(self.font_name, size)
-        text_surface = font.render(text, True, color)
+            if player_screen_rect.left < 200:
+                self.level.shift_world(200 - player_screen_rect.left)
+
+            with profiler.section('collision.enemies'):
+                self._check_enemy_collisions()
+                self._check_projectiles()
+                self._collect_pickups()
+
+            # --- Level transitions ---
+            if self.level.width is not None and self.player.rect.right >= self.level.width:
+                self.advance_level()
+
+            self.ticks += 1
+            if self.autosaver is not None and self.ticks % AUTOSAVE_TICKS == 0:
+                self.autosaver.submit(self.snapshot())
+
+    def _check_enemy_collisions(self):
+        """
+        Resolve the player's attack against enemies, and enemies touching the
+        player. Both only look at the enemies the level's grid puts nearby.
+        The attack hitbox is a plain rect; contact compares the player's
+        pixel mask against the enemies whose rects overlap it.
+        """
+        # --- Attack collision ---
+        if self.player.attacking:
+            # The attack_rect and the enemy rects are both in world coordinates.
+            attack_rect = self.player.attack_rect
+            for enemy in self.level.enemies_colliding(attack_rect):
+                self.kill_enemy(enemy)
+
+        # --- Player-enemy collision ---
+        # Only check for player-enemy collision if the player is not attacking.
+        # Staying in contact keeps publishing the hit, which the bus only
+        # delivers on the first tick of it
+        if not self.player.attacking:
+            for enemy in self.level.enemies_colliding(self.player.rect, self.player.mask):
+                contact = self.player.rect.clip(enemy.rect)
+                self.bus.publish(Hit(enemy.spawn_id, contact.centerx, contact.centery))
+
+    def _check_projectiles(self):
+        """
+        Kill the first enemy each projectile touches, and stop projectiles
+        that hit a platform. Projectiles are few, so each gets its own query.
+        """
+        projectiles = self.level.projectiles
+        for slot, rect in projectiles.rects():
+            enemies = self.level.enemies_colliding(rect)
+            if enemies:
+                projectiles.remove(slot)
+                self.kill_enemy(enemies[0])
+            elif self.level.platforms_colliding(rect):
+                projectiles.remove(slot)
+                self.level.particles.emit('spark', rect.centerx, rect.centery, HIT_SPARKS)
+
+    def _collect_pickups(self):
+        """
+        Pick up the dropped items the player is touching.
+        """
+        slots = self.level.particles.overlapping(self.player.rect, 'pickup')
+        if len(slots):
+            self.level.particles.remove(slots)
+            self.bus.publish(ItemPickedUp(len(slots)))
+
+    def kill_enemy(self, enemy):
+        """
+        Remove an enemy the player defeated and announce it.
+        """
+        x, y = enemy.rect.center
+        self.level.kill_enemy(enemy)
+        self.bus.publish(Kill(enemy.spawn_id, enemy.xp_reward, x, y))
+
+    def award_kill_xp(self, event):
+        """
+        Give the player a roll of the killed enemy's XP reward.
+        """
+        self.player.add_xp(self.rng.randint(event.xp_reward[0], event.xp_reward[1]))
+
+    def roll_item_drop(self, event):
+        """
+        Killed enemies drop an item half of the time.
+        """
+        if self.rng.random() < 0.5:
+            self.bus.publish(ItemDropped(event.x, event.y))
+
+    def spawn_death_burst(self, event):
+        """
+        Burst a killed enemy into particles.
+        """
+        self.level.particles.emit('burst', event.x, event.y, DEATH_BURST)
+
+    def spawn_hit_sparks(self, event):
+        """
+        Throw sparks where an enemy touched the player.
+        """
+        self.level.particles.emit('spark', event.x, event.y, HIT_SPARKS)
+
+    def spawn_pickup(self, event):
+        """
+        Pop a dropped item up out of the enemy, for the player to collect.
+        """
+        self.level.particles.emit('pickup', event.x, event.y, 1, angle=-math.pi / 2, spread=math.pi / 2)
+
+    def draw_text(self, text, size, color, x, y, surface=None):
+        """
+        Helper function to draw text on the screen (or another surface).
+        Fonts and rendered text are cached, so redrawing unchanged text is
+        just a blit.
+        """
+        text_surface = self.text.render(text, size, color)
         text_rect = text_surface.get_rect()
         text_rect.topleft = (x, y)
-        self.screen.blit(text_surface, text_rect)
+        if surface is None:
+            surface = self.screen
+        surface.blit(text_surface, text_rect)
 
-    def draw_character_screen(self):
+    def draw_character_screen(self, surface=None):
         """
         Draws the character statistics screen.
         """
+        if surface is None:
+            surface = self.screen
         # Draw a semi-transparent background
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180)) # Black with 180/255 alpha
-        self.screen.blit(overlay, (0, 0))
+        surface.blit(self.menu_overlay, (0, 0))
 
         # --- Draw the stats ---
         y_pos = 100
-        self.draw_text("Character Stats", 48, WHITE, 100, y_pos)
+        self.draw_text("Character Stats", 48, WHITE, 100, y_pos, surface)
         y_pos += 60
-        self.draw_text(f"Level: {self.player.character_level}", 30, WHITE, 100, y_pos)
+        self.draw_text(f"Level: {self.player.character_level}", 30, WHITE, 100, y_pos, surface)
         y_pos += 40
-        self.draw_text(f"XP: {self.player.xp} / {self.player.xp_to_next_level}", 30, WHITE, 100, y_pos)
+        self.draw_text(f"XP: {self.player.xp} / {self.player.xp_to_next_level}", 30, WHITE, 100, y_pos, surface)
         y_pos += 60
-        self.draw_text(f"Points to Spend: {self.player.available_stat_points}", 30, GREEN, 100, y_pos)
+        self.draw_text(f"Points to Spend: {self.player.available_stat_points}", 30, GREEN, 100, y_pos, surface)
         y_pos += 60
 
         stats = {
@@ -165,48 +468,105 @@ class Game:
 
         button_size = 20
         for stat_name, stat_value in stats.items():
-            self.draw_text(f"{stat_name}: {stat_value}", 24, WHITE, 100, y_pos)
+            self.draw_text(f"{stat_name}: {stat_value}", 24, WHITE, 100, y_pos, surface)
 
             # Draw the '+' button
             button_rect = pygame.Rect(350, y_pos, button_size, button_size)
-            pygame.draw.rect(self.screen, WHITE, button_rect)
-            self.draw_text("+", 20, BLACK, 355, y_pos - 2) # Adjust text position slightly
+            pygame.draw.rect(surface, WHITE, button_rect)
+            self.draw_text("+", 20, BLACK, 355, y_pos - 2, surface) # Adjust text position slightly
 
             # Store the button rect for click detection later
             self.stat_buttons[stat_name] = button_rect
 
             y_pos += 40
 
-    def draw(self):
+    def draw(self, alpha=1.0):
         """
-        Draw everything to the screen.
+        Draw everything to the screen. alpha is how far the frame falls
+        between the previous simulation tick and the current one.
         """
-        # Always draw the game world
-        self.screen.fill(BLACK)
-        self.level.draw(self.screen)
-        self.all_sprites.draw(self.screen)
+        # Nothing moves while a menu is open, so draw the current tick as is
+        if self.game_state != 'playing':
+            alpha = 1.0
+        camera = self.level.camera
+        camera.interpolate(alpha)
 
-        # Draw attack hitbox for debugging/feedback
-        if self.player.attacking:
-            pygame.draw.rect(self.screen, (255, 255, 255), self.player.attack_rect)
+        if self.renderer is not None:
+            view_key = (round(camera.draw_x), self.game_state)
+            self.renderer.render(view_key, self.draw_static, lambda surface: self.draw_dynamic(surface, alpha))
+            return
+
+        self.draw_static(self.screen)
+        self.draw_dynamic(self.screen, alpha)
+        if not self.headless:
+            pygame.display.flip()
+
+    def draw_static(self, surface):
+        """
+        Draw everything that only changes when the view does: the background
+        and platforms, plus the paused world and menu while a menu is open.
+        """
+        surface.fill(BLACK)
+        self.level.draw_static(surface)
 
-        # If in a menu state, draw it on top
+        # If in a menu state, the world is paused, so it is drawn here with the menu on top
         if self.game_state == 'character_screen':
-            self.draw_character_screen()
+            self._draw_moving(surface, 1.0)
+            with profiler.section('character_screen'):
+                self.draw_character_screen(surface)
+
+    def draw_dynamic(self, surface, alpha):
+        """
+        Draw everything that can change from one frame to the next and
+        return the screen rects that were drawn to.
+        """
+        rects = []
+        if self.game_state == 'playing':
+            rects.extend(self._draw_moving(surface, alpha))
+        if profiler.overlay_visible:
+            rects.append(profiler.draw_overlay(surface, self.text.font(OVERLAY_FONT_SIZE), self.clock.get_fps()))
+        return rects
 
-        pygame.display.flip()
+    def _draw_moving(self, surface, alpha):
+        """
+        Draw the enemies, the player and the attack hitbox, returning their rects.
+        """
+        camera = self.level.camera
+        rects = self.level.draw_dynamic(surface, alpha)
+        for sprite in self.all_sprites:
+            rects.append(surface.blit(sprite.image, camera.draw_rect(sprite.interpolated_rect(alpha))))
+
+        # Draw attack hitbox for debugging/feedback
+        if self.player.attacking:
+            rects.append(pygame.draw.rect(surface, (255, 255, 255), camera.draw_rect(self.player.attack_rect)))
+        return rects
 
     def quit(self):
         """
         Quit the game.
         """
+        if profiler.trace is not None:
+            profiler.dump_trace(self.trace_path)
+        if self.autosaver is not None:
+            self.autosaver.submit(self.snapshot())
+            self.autosaver.close()
+        if self.record_path is not None:
+            write_replay(self.record_path, self.start, self.input.masks)
+        self.level.close()
+        self.log.close()
         pygame.quit()
 
 def main():
     """
     Main function to run the game.
     """
-    game = Game()
+    parser = argparse.ArgumentParser(description=TITLE)
+    parser.add_argument('level', nargs='?', help="level file to play instead of a generated level")
+    parser.add_argument('--save', help="save game to resume from and autosave to")
+    parser.add_argument('--record', help="record the session to this file, for replay.py")
+    parser.add_argument('--seed', type=int, help="seed for the level and all gameplay randomness")
+    args = parser.parse_args()
+    game = Game(seed=args.seed, level_path=args.level, save_path=args.save, record_path=args.record)
     game.run()
 
 if __name__ == '__main__':
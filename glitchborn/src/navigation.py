@@ -0,0 +1,309 @@
+"""
+Platform navigation.
+
+A NavGraph has a node per platform and an edge wherever something that
+moves and jumps like the player can get from one platform onto another:
+by walking off the edge, with a jump, or with a double jump at the top of
+the first one. Whether an edge exists is decided from jump arcs simulated
+once, with the same gravity, jump and speed rules as the player, so
+building the graph never simulates a jump.
+
+The level extends the graph chunk by chunk as it streams chunks in and
+trims it as they are evicted. Paths are found with A* and cached until
+the graph changes.
+"""
+import heapq
+import math
+import numpy as np
+from collections import OrderedDict
+from player import GRAVITY, JUMP_HEIGHT, PLAYER_SPEED
+
+# --- Constants ---
+NAV_SPEED = PLAYER_SPEED # Horizontal pixels per tick in the air
+MAX_FALL = 1200 # Arcs are followed down to this far below the takeoff height
+LANDING_MARGIN = 16 # How far onto a platform an edge lands
+CLEARANCE = 16 # How far beside a platform above a jump takes off, to clear its edge
+PATH_CACHE_SIZE = 256 # Most paths kept
+ARC_KINDS = ('drop', 'jump', 'double') # Tried in this order; the first that works is used
+
+def _simulate_arc(jump_velocity, double_jump):
+    """
+    Return the height above the takeoff point after each tick, moving the
+    way the gravity and movement systems move the player.
+    """
+    heights = [0.0]
+    y = 0.0
+    dy = jump_velocity
+    jumped_again = not double_jump
+    while y < MAX_FALL:
+        # The gravity system gives a body at rest a small push to start it falling
+        dy = 1 if dy == 0 else dy + GRAVITY
+        if not jumped_again and dy >= 0:
+            dy = JUMP_HEIGHT
+            jumped_again = True
+        y += dy
+        heights.append(-y)
+    return np.array(heights)
+
+class JumpArc:
+    """
+    One kind of jump, simulated once: its height after every tick and when
+    it comes down onto a platform at any given height.
+    """
+    def __init__(self, kind, heights):
+        """
+        Initialize the arc from its per-tick heights.
+        """
+        self.kind = kind
+        self.heights = heights
+        self.apex_tick = int(np.argmax(heights))
+        self.apex = heights[self.apex_tick]
+        # Falling heights, negated so they increase for searchsorted
+        self._descent = -heights[self.apex_tick:]
+
+    def landing_tick(self, rise):
+        """
+        Return the tick this arc comes down onto a surface rise pixels above
+        the takeoff point (negative for below), or None if it never does.
+        """
+        if rise >= self.apex:
+            return None
+        index = int(np.searchsorted(self._descent, -rise))
+        if index >= len(self._descent):
+            return None
+        return self.apex_tick + index
+
+# Walking off an edge, a single jump and a double jump at the top of the first
+ARCS = {
+    'drop': JumpArc('drop', _simulate_arc(0, False)),
+    'jump': JumpArc('jump', _simulate_arc(JUMP_HEIGHT, False)),
+    'double': JumpArc('double', _simulate_arc(JUMP_HEIGHT, True)),
+}
+# No edge climbs more than MAX_RISE pixels, and an edge that climbs at all
+# comes down after the top of its arc, so it takes at least RISE_TICKS ticks
+MAX_RISE = max(arc.apex for arc in ARCS.values())
+RISE_TICKS = min(arc.apex_tick for arc in ARCS.values() if arc.apex > 0)
+
+class NavEdge:
+    """
+    A way from one platform onto another: take off from takeoff_x on the
+    source platform heading direction (1 right, -1 left), follow the arc
+    and come down at landing_x on the target after ticks ticks. Paths are
+    costed by time in the air; walking along a platform is free.
+    """
+    __slots__ = ('target', 'arc', 'direction', 'takeoff_x', 'landing_x', 'ticks')
+
+    def __init__(self, target, arc, direction, takeoff_x, landing_x, ticks):
+        """
+        Initialize the edge onto the node target along the arc named arc.
+        """
+        self.target = target
+        self.arc = arc
+        self.direction = direction
+        self.takeoff_x = takeoff_x
+        self.landing_x = landing_x
+        self.ticks = ticks
+
+    def position(self, source_top, target_top, tick):
+        """
+        Return the (x, y) foot position tick ticks after takeoff. tick may
+        fall between two ticks; the height is then taken from the earlier.
+        """
+        if tick >= self.ticks:
+            return self.landing_x, target_top
+        x = self.takeoff_x + (self.landing_x - self.takeoff_x) * tick / self.ticks
+        return x, source_top - ARCS[self.arc].heights[int(tick)]
+
+def find_edge(source, target, direction, target_id=None):
+    """
+    Return a NavEdge from the platform rect source onto target heading
+    direction, or None if neither walking off nor jumping gets there. Rects
+    are (x, y, width, height) tuples.
+    """
+    # Work heading right; heading left is the same with x mirrored
+    if direction > 0:
+        a_left, a_right = source[0], source[0] + source[2]
+        b_left, b_right = target[0], target[0] + target[2]
+    else:
+        a_left, a_right = -(source[0] + source[2]), -source[0]
+        b_left, b_right = -(target[0] + target[2]), -target[0]
+    rise = source[1] - target[1]
+
+    for kind in ARC_KINDS:
+        arc = ARCS[kind]
+        if kind == 'drop':
+            # Walk off the end of the source platform
+            takeoff = a_right
+        else:
+            # Jump from beside the target, or from the end of the source
+            takeoff = min(a_right, b_left - CLEARANCE)
+            if takeoff < a_left:
+                continue
+        landing = max(b_left, takeoff) + LANDING_MARGIN
+        if landing > b_right:
+            continue
+        ticks = arc.landing_tick(rise)
+        if ticks is None or landing - takeoff > NAV_SPEED * ticks:
+            continue
+        if direction < 0:
+            takeoff, landing = -takeoff, -landing
+        return NavEdge(target_id, kind, direction, takeoff, landing, ticks)
+    return None
+
+def reachable(source, target):
+    """
+    Return whether the platform rect target can be reached from source
+    heading either way.
+    """
+    return find_edge(source, target, 1) is not None or find_edge(source, target, -1) is not None
+
+class NavGraph:
+    """
+    The navigation graph of a level. Nodes are platforms, identified by
+    (chunk index, position in the chunk's layout) so they stay the same
+    when a chunk is evicted and streamed back in.
+    """
+    def __init__(self, chunk_width, max_cached=PATH_CACHE_SIZE):
+        """
+        Initialize an empty graph for a level of chunk_width pixel chunks.
+        """
+        self.chunk_width = chunk_width
+        self.nodes = {} # Node id -> platform rect as (x, y, width, height)
+        self.edges = {} # Node id -> list of NavEdges leaving it
+        self.chunk_nodes = {} # Chunk index -> node ids
+        self.max_cached = max_cached
+        self.paths = OrderedDict() # (start, goal) -> list of NavEdges, or None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """
+        The number of platforms in the graph.
+        """
+        return len(self.nodes)
+
+    def _link(self, source, target):
+        """
+        Add the edges between two nodes, in whichever directions exist.
+        """
+        for a, b in ((source, target), (target, source)):
+            rect_a = self.nodes[a]
+            rect_b = self.nodes[b]
+            for direction in (1, -1):
+                edge = find_edge(rect_a, rect_b, direction, b)
+                if edge is not None:
+                    self.edges[a].append(edge)
+                    break
+
+    def add_chunk(self, layout):
+        """
+        Add a chunk's platforms and connect them to each other and to the
+        neighbouring chunks already in the graph.
+        """
+        index = layout.index
+        if index in self.chunk_nodes:
+            return
+        added = []
+        for i, (x, y, width, height, _) in enumerate(layout.platforms):
+            node = (index, i)
+            self.nodes[node] = (x, y, width, height)
+            self.edges[node] = []
+            added.append(node)
+        self.chunk_nodes[index] = added
+
+        linked = set()
+        for node in added:
+            linked.add(node)
+            for neighbour_index in (index - 1, index, index + 1):
+                for other in self.chunk_nodes.get(neighbour_index, ()):
+                    if other not in linked:
+                        self._link(node, other)
+        self.paths.clear()
+
+    def remove_chunk(self, index):
+        """
+        Remove a chunk's platforms and every edge onto them.
+        """
+        removed = self.chunk_nodes.pop(index, None)
+        if removed is None:
+            return
+        for node in removed:
+            del self.nodes[node]
+            del self.edges[node]
+        removed = set(removed)
+        for neighbour_index in (index - 1, index + 1):
+            for node in self.chunk_nodes.get(neighbour_index, ()):
+                self.edges[node] = [edge for edge in self.edges[node] if edge.target not in removed]
+        self.paths.clear()
+
+    def _heuristic(self, node, goal):
+        """
+        A lower bound on the cost from node to goal. Walking is free, so
+        horizontal distance bounds nothing; climbing does: it takes at least
+        one rising edge per MAX_RISE pixels, each at least RISE_TICKS long.
+        """
+        rise = self.nodes[node][1] - self.nodes[goal][1]
+        if rise <= 0:
+            return 0
+        return math.ceil(rise / MAX_RISE) * RISE_TICKS
+
+    def path(self, start, goal):
+        """
+        Return the cheapest list of edges from node start to node goal, an
+        empty list if they are the same node, or None if goal can't be
+        reached. Results are cached until the graph changes.
+        """
+        key = (start, goal)
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            self.hits += 1
+            return self.paths[key]
+        self.misses += 1
+        result = self._search(start, goal)
+        self.paths[key] = result
+        if len(self.paths) > self.max_cached:
+            self.paths.popitem(last=False)
+        return result
+
+    def _search(self, start, goal):
+        """
+        A* from start to goal.
+        """
+        if start not in self.nodes or goal not in self.nodes:
+            return None
+        if start == goal:
+            return []
+        costs = {start: 0.0}
+        came_from = {}
+        frontier = [(self._heuristic(start, goal), 0, start)]
+        counter = 1 # Breaks ties between equal costs without comparing nodes
+        while frontier:
+            _, _, node = heapq.heappop(frontier)
+            if node == goal:
+                path = []
+                while node != start:
+                    node, edge = came_from[node]
+                    path.append(edge)
+                path.reverse()
+                return path
+            for edge in self.edges[node]:
+                cost = costs[node] + edge.ticks
+                if cost < costs.get(edge.target, float('inf')):
+                    costs[edge.target] = cost
+                    came_from[edge.target] = (node, edge)
+                    heapq.heappush(frontier, (cost + self._heuristic(edge.target, goal), counter, edge.target))
+                    counter += 1
+        return None
+
+    def node_at(self, x, y, tolerance=2):
+        """
+        Return the node whose platform top is at the foot position (x, y),
+        or None.
+        """
+        # Nodes are stored by chunk, so only the chunk under x is searched
+        for index in {int(x // self.chunk_width) + offset for offset in (-1, 0, 1)}:
+            for node in self.chunk_nodes.get(index, ()):
+                left, top, width, _ = self.nodes[node]
+                if left <= x <= left + width and abs(y - top) <= tolerance:
+                    return node
+        return None
@@ -0,0 +1,212 @@
+"""
+Particles and projectiles.
+
+A ParticlePool keeps a fixed number of slots in NumPy arrays (position,
+velocity, age, lifetime and kind) allocated up front. Spawning claims free
+slots, every tick moves and ages all live particles in a few array
+operations, and drawing is one batched blit of the visible ones. No
+Python object is created per particle, so thousands of live particles cost
+about as much as a handful.
+
+What a particle looks like and how it moves comes from its kind. The
+level keeps one pool of effects (hit sparks, death bursts, item pickups)
+and one of projectiles, which the game tests against platforms and
+enemies.
+"""
+import math
+import numpy as np
+import pygame
+from assets import solid_surface
+from ecs import TICK_MS
+
+# --- Constants ---
+PARTICLE_CAPACITY = 4096
+PROJECTILE_CAPACITY = 64
+# Kind name -> size, color, lifetime (ms), gravity and drag (per TICK_MS
+# tick), and the speed particles are thrown at (pixels per TICK_MS tick)
+PARTICLE_KINDS = {
+    'spark': {'size': (3, 3), 'color': (255, 255, 160), 'lifetime': 250, 'gravity': 0.2, 'drag': 0.9, 'speed': 5},
+    'burst': {'size': (4, 4), 'color': (255, 80, 40), 'lifetime': 600, 'gravity': 0.3, 'drag': 0.96, 'speed': 6},
+    'pickup': {'size': (10, 10), 'color': (255, 215, 0), 'lifetime': 8000, 'gravity': 0.0, 'drag': 0.85, 'speed': 5},
+}
+PROJECTILE_KINDS = {
+    'bolt': {'size': (16, 4), 'color': (120, 200, 255), 'lifetime': 1000, 'gravity': 0.0, 'drag': 1.0, 'speed': 12},
+}
+
+class ParticlePool:
+    """
+    A fixed-capacity pool of particles of the given kinds. Particles are
+    identified by their slot, which is reused once they expire.
+    """
+    def __init__(self, kinds, capacity=PARTICLE_CAPACITY, seed=None):
+        """
+        Initialize an empty pool. seed drives the random spread of emitted
+        particles; they are only for show, so it doesn't touch the game's
+        random stream.
+        """
+        self.capacity = capacity
+        self.kind_names = list(kinds)
+        self.kind_ids = {name: i for i, name in enumerate(self.kind_names)}
+        # Per-kind properties, indexed by kind id
+        self.kind_size = np.array([kinds[name]['size'] for name in self.kind_names], dtype=np.int32)
+        self.kind_lifetime = np.array([kinds[name]['lifetime'] for name in self.kind_names], dtype=np.float64)
+        self.kind_gravity = np.array([kinds[name]['gravity'] for name in self.kind_names], dtype=np.float64)
+        self.kind_drag = np.array([kinds[name]['drag'] for name in self.kind_names], dtype=np.float64)
+        self.kind_speed = [kinds[name]['speed'] for name in self.kind_names]
+        self.kind_images = [solid_surface(kinds[name]['size'], kinds[name]['color']) for name in self.kind_names]
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        # Positions at the start of the tick, for render interpolation
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.age = np.zeros(capacity)
+        self.lifetime = np.zeros(capacity)
+        self.kind = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.rng = np.random.default_rng(seed)
+        self.dropped = 0 # Particles that didn't fit because the pool was full
+
+    def __len__(self):
+        """
+        The number of live particles.
+        """
+        return int(np.count_nonzero(self.alive))
+
+    def emit(self, kind, x, y, count=1, angle=0.0, spread=2 * math.pi, speed=None):
+        """
+        Spawn up to count particles of kind centered on (x, y), thrown at
+        angles within spread radians around angle (0 is right, pi / 2 is
+        down) and at up to speed pixels per tick. Returns the slots used;
+        particles that don't fit in the pool are dropped.
+        """
+        kind_id = self.kind_ids[kind]
+        slots = np.flatnonzero(~self.alive)[:count]
+        self.dropped += count - len(slots)
+        n = len(slots)
+        if n == 0:
+            return slots
+        if speed is None:
+            speed = self.kind_speed[kind_id]
+        angles = angle + self.rng.uniform(-spread / 2, spread / 2, n)
+        speeds = speed * self.rng.uniform(0.3, 1.0, n)
+        width, height = self.kind_size[kind_id]
+        self.x[slots] = self.prev_x[slots] = x - width / 2
+        self.y[slots] = self.prev_y[slots] = y - height / 2
+        self.dx[slots] = np.cos(angles) * speeds
+        self.dy[slots] = np.sin(angles) * speeds
+        self.age[slots] = 0
+        self.lifetime[slots] = self.kind_lifetime[kind_id]
+        self.kind[slots] = kind_id
+        self.alive[slots] = True
+        return slots
+
+    def launch(self, kind, x, y, dx, dy=0.0):
+        """
+        Spawn one particle of kind centered on (x, y) with an exact velocity,
+        e.g. a projectile. Returns its slot, or None if the pool is full.
+        """
+        free = np.flatnonzero(~self.alive)
+        if len(free) == 0:
+            self.dropped += 1
+            return None
+        slot = free[0]
+        kind_id = self.kind_ids[kind]
+        width, height = self.kind_size[kind_id]
+        self.x[slot] = self.prev_x[slot] = x - width / 2
+        self.y[slot] = self.prev_y[slot] = y - height / 2
+        self.dx[slot] = dx
+        self.dy[slot] = dy
+        self.age[slot] = 0
+        self.lifetime[slot] = self.kind_lifetime[kind_id]
+        self.kind[slot] = kind_id
+        self.alive[slot] = True
+        return int(slot)
+
+    def update(self, dt_ms):
+        """
+        Move and age every live particle by one tick of dt_ms, and free the
+        expired.
+        """
+        live = np.flatnonzero(self.alive)
+        if len(live) == 0:
+            return
+        tick_scale = dt_ms / TICK_MS
+        kind = self.kind[live]
+        drag = self.kind_drag[kind] ** tick_scale
+        dx = self.dx[live] * drag
+        dy = (self.dy[live] + self.kind_gravity[kind] * tick_scale) * drag
+        self.dx[live] = dx
+        self.dy[live] = dy
+        x = self.x[live]
+        y = self.y[live]
+        self.prev_x[live] = x
+        self.prev_y[live] = y
+        self.x[live] = x + dx * tick_scale
+        self.y[live] = y + dy * tick_scale
+        age = self.age[live] + dt_ms
+        self.age[live] = age
+        self.alive[live] = age < self.lifetime[live]
+
+    def remove(self, slots):
+        """
+        Free the given slots.
+        """
+        self.alive[slots] = False
+
+    def clear(self):
+        """
+        Free every slot.
+        """
+        self.alive[:] = False
+
+    def overlapping(self, rect, kind=None):
+        """
+        Return the slots of live particles (of kind, if given) overlapping
+        rect, tested all at once.
+        """
+        live = np.flatnonzero(self.alive)
+        if kind is not None:
+            live = live[self.kind[live] == self.kind_ids[kind]]
+        size = self.kind_size[self.kind[live]]
+        x = self.x[live]
+        y = self.y[live]
+        hit = ((x + size[:, 0] > rect.left) & (x < rect.right)
+               & (y + size[:, 1] > rect.top) & (y < rect.bottom))
+        return live[hit]
+
+    def rects(self):
+        """
+        Return (slot, rect) for every live particle. Meant for small pools
+        such as projectiles, whose particles each need a level query.
+        """
+        live = np.flatnonzero(self.alive)
+        size = self.kind_size[self.kind[live]]
+        return [(int(slot), pygame.Rect(int(x), int(y), int(w), int(h)))
+                for slot, x, y, (w, h) in zip(live, self.x[live], self.y[live], size)]
+
+    def draw(self, screen, camera, view, alpha=1.0):
+        """
+        Draw every live particle overlapping view (a world-space rect) in
+        one batched blit, alpha of the way from where it was at the start
+        of the tick to where it is, and return the screen rects that were
+        drawn to.
+        """
+        live = np.flatnonzero(self.alive)
+        if len(live) == 0:
+            return []
+        kind = self.kind[live]
+        size = self.kind_size[kind]
+        x = self.x[live]
+        y = self.y[live]
+        x = x - (x - self.prev_x[live]) * (1 - alpha)
+        y = y - (y - self.prev_y[live]) * (1 - alpha)
+        visible = ((x + size[:, 0] > view.left) & (x < view.right)
+                   & (y + size[:, 1] > view.top) & (y < view.bottom))
+        offset = round(camera.draw_x)
+        sx = (x[visible] - offset).astype(np.int32).tolist()
+        sy = y[visible].astype(np.int32).tolist()
+        images = self.kind_images
+        return screen.blits([(images[k], (px, py)) for k, px, py in zip(kind[visible].tolist(), sx, sy)], True)
@@ -1,4 +1,5 @@
 import pygame
+from assets import solid_surface, tiled_surface
 
 # --- Constants ---
 PLATFORM_COLOR = (0, 255, 0) # Green
@@ -12,12 +13,23 @@ class Platform(pygame.sprite.Sprite):
         Initialize the platform.
         """
         super().__init__()
-        self.image = pygame.Surface([width, height])
+        # Platforms of the same size and look share one cached surface
         if tile_image:
-            tile_w, tile_h = tile_image.get_size()
-            for x in range(0, int(width), tile_w):
-                for y in range(0, int(height), tile_h):
-                    self.image.blit(tile_image, (x, y))
+            self.image = tiled_surface((width, height), tile_image)
         else:
-            self.image.fill(PLATFORM_COLOR)
+            self.image = solid_surface((width, height), PLATFORM_COLOR)
         self.rect = self.image.get_rect()
+        # Set when the platform is attached to a World
+        self.world = None
+        self.entity = None
+
+    @property
+    def components(self):
+        """
+        The components this platform is attached to a World with.
+        """
+        return {
+            'position': {'x': self.rect.x, 'y': self.rect.y},
+            'size': {'w': self.rect.width, 'h': self.rect.height},
+            'solid': None,
+        }
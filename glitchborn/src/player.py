@@ -1,4 +1,11 @@
 import pygame
+from animation import Animation, FrameTable, shared_table
+from controls import InputState
+from events import XpGained, LevelUp
+from profiler import profiler
+from collision import sweep_aabb, swept_bounds
+from ecs import ComponentField
+from particles import PROJECTILE_KINDS
 
 # --- Constants ---
 PLAYER_WIDTH = 32
@@ -7,50 +14,58 @@ PLAYER_COLOR = (255, 0, 0) # Red
 PLAYER_SPEED = 5
 GRAVITY = 0.35
 JUMP_HEIGHT = -10
+PLAYER_COLORKEY = (255, 255, 255) # White backgrounds in the frames are transparent
+IDLE_FRAME = "player_s.png"
+WALK_FRAMES = ["player_walk1.png", "player_walk2.png", "player_walk3.png", "player_walk4.png"]
+PLAYER_FRAMES = [IDLE_FRAME] + WALK_FRAMES
+WALK_FRAME_MS = 100
+SHOOT_COOLDOWN = 400 # ms between ranged attacks
+PROJECTILE = 'bolt'
+# Progression saved by snapshot()
+SAVED_STATS = ('character_level', 'xp', 'xp_to_next_level', 'strength', 'dexterity', 'intelligence', 'wisdom',
+               'charisma', 'available_stat_points')
 
 class Player(pygame.sprite.Sprite):
     """
-    The player character.
+    The player character. Its velocity, gravity and attack timer live in the
+    level's World, where the gravity, movement and attack systems advance
+    them; the attributes below read and write those components.
     """
+    change_x = ComponentField('velocity', 'dx')
+    change_y = ComponentField('velocity', 'dy')
+    attacking = ComponentField('attack', 'active')
+    attack_time = ComponentField('attack', 'start')
+    attack_duration = ComponentField('attack', 'duration')
+
     def __init__(self, start_x, start_y):
         """
         Initialize the player.
         """
         super().__init__()
-        # -- Load images for animations ---
-        # -- Load images for animations ---
-        self.idle_image = pygame.image.load("glitchborn/assets/player_s.png").convert()
-        self.idle_image.set_colorkey((255, 255, 255))
-        self.walk_frames = [
-            pygame.image.load("glitchborn/assets/player_walk1.png").convert(),
-            pygame.image.load("glitchborn/assets/player_walk2.png").convert(),
-            pygame.image.load("glitchborn/assets/player_walk3.png").convert(),
-            pygame.image.load("glitchborn/assets/player_walk4.png").convert()
-        ]
-        for frame in self.walk_frames:
-            frame.set_colorkey((255, 255, 255))
-
-        # Create flipped images for moving left
-        self.idle_image_left = pygame.transform.flip(self.idle_image, True, False)
-        self.walk_frames_left = [pygame.transform.flip(img, True, False) for img in self.walk_frames]
-
-        self.image = self.idle_image
+        # Set when the player is attached to a World
+        self.world = None
+        self.entity = None
+
+        # The frames, their flipped variants and masks are built once and
+        # shared, so creating another player costs no I/O
+        self.animation = Animation(shared_table('player', lambda: FrameTable.from_assets(
+            {'idle': [IDLE_FRAME], 'walk': WALK_FRAMES}, colorkey=PLAYER_COLORKEY, frame_ms=WALK_FRAME_MS)))
         self.rect = self.image.get_rect()
         self.rect.x = start_x
         self.rect.y = start_y
+        # Position at the start of the current tick, for render interpolation
+        self.prev_rect = self.rect.copy()
 
         # --- Animation attributes ---
         self.walking = False
         self.facing_right = True
-        self.frame_index = 0
-        self.last_update = pygame.time.get_ticks()
-        self.animation_speed = 100 # ms per frame
 
         # --- Attack attributes ---
         self.attacking = False
         self.attack_rect = pygame.Rect(0, 0, 0, 0)
         self.attack_duration = 300 # ms
         self.attack_time = 0
+        self.last_shot = -SHOOT_COOLDOWN
 
         # --- Stats ---
         self.character_level = 1
@@ -66,61 +81,151 @@ class Player(pygame.sprite.Sprite):
 
         self.change_x = 0
         self.change_y = 0
+        # Fractions of a pixel moved but not yet applied to rect
+        self.subpixel_x = 0.0
+        self.subpixel_y = 0.0
         self.jump_count = 0
         self.level = None
+        # Where XP gains and level-ups are published, set by the game
+        self.bus = None
+        # The actions requested for the current tick, set by the game
+        self.controls = InputState()
+
+    @property
+    def components(self):
+        """
+        The components this player is attached to a World with.
+        """
+        return {
+            'position': {'x': self.rect.x, 'y': self.rect.y},
+            'velocity': None,
+            'gravity': {'strength': GRAVITY},
+            'attack': None,
+            'body': None,
+        }
+
+    @property
+    def image(self):
+        """
+        The current animation frame.
+        """
+        return self.animation.image
+
+    @property
+    def mask(self):
+        """
+        The pixel mask of the current animation frame.
+        """
+        return self.animation.mask
+
+    @property
+    def time(self):
+        """
+        Simulated milliseconds. Timers run on simulated time rather than the
+        wall clock, so they behave the same however fast frames are drawn.
+        """
+        return self.world.time if self.world is not None else 0
 
     def update(self):
         """
-        Update the player's position and handle physics.
+        Animate the player. Called once per fixed simulation tick, before
+        the level's systems move the player.
         """
-        self._animate()
-        self._handle_attack_timer()
+        self.prev_rect = self.rect.copy()
+        self.animation.update(self.time, 'walk' if self.walking else 'idle', self.facing_right)
 
-        # --- Gravity ---
-        self.calc_grav()
+    def move(self):
+        """
+        Move the player by its velocity, resolving collisions with the
+        platforms, then take the horizontal input for the next move. Called
+        by the movement system after gravity is applied.
+        """
+        # Velocities are per TICK_MS tick. Scaled to other tick lengths they
+        # come out as fractions of a pixel, which are saved up until they
+        # add up to a whole one
+        tick_scale = self.world.tick_scale if self.world is not None else 1.0
+        self.subpixel_x += self.change_x * tick_scale
+        self.subpixel_y += self.change_y * tick_scale
+        dx = round(self.subpixel_x)
+        dy = round(self.subpixel_y)
+        self.subpixel_x -= dx
+        self.subpixel_y -= dy
 
         # --- Move left/right ---
-        self.rect.x += self.change_x
+        # Each axis is swept against the platforms, so no speed can tunnel through one
+        if self.change_x != 0:
+            (time_of_impact, normal, block), embedded = self._sweep(dx, 0)
+            if block is None:
+                self.rect.x += dx
+            else:
+                self.subpixel_x = 0.0
+                if normal[0] < 0:
+                    self.rect.right = block.left
+                else:
+                    self.rect.left = block.right
 
-        # Check for horizontal collisions
-        block_hit_list = pygame.sprite.spritecollide(self, self.level.platform_list, False)
-        for block in block_hit_list:
-            if self.change_x > 0:
-                self.rect.right = block.rect.left
-            elif self.change_x < 0:
-                self.rect.left = block.rect.right
+            # Platforms we were already inside of (e.g. after spawning in one)
+            # can't be swept against, so push out of them directly
+            for block in embedded:
+                if self.rect.colliderect(block):
+                    if self.change_x > 0:
+                        self.rect.right = block.left
+                    else:
+                        self.rect.left = block.right
 
         # --- Move up/down ---
-        self.rect.y += self.change_y
-
-        # Check for vertical collisions
-        block_hit_list = pygame.sprite.spritecollide(self, self.level.platform_list, False)
-        for block in block_hit_list:
-            if self.change_y > 0:
-                self.rect.bottom = block.rect.top
-                self.change_y = 0
-                self.jump_count = 0
-            elif self.change_y < 0:
-                self.rect.top = block.rect.bottom
-                self.change_y = 0
-
-        # --- Handle keyboard input for horizontal movement ---
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_a]:
+        if self.change_y != 0:
+            (time_of_impact, normal, block), embedded = self._sweep(0, dy)
+            if block is None:
+                self.rect.y += dy
+            else:
+                self._land_or_bump(block, normal[1] < 0)
+
+            for block in embedded:
+                if self.change_y != 0 and self.rect.colliderect(block):
+                    self._land_or_bump(block, self.change_y > 0)
+
+        # --- Handle input for horizontal movement ---
+        if self.controls.left:
             self.go_left()
-        elif keys[pygame.K_d]:
+        elif self.controls.right:
             self.go_right()
         else:
             self.stop()
 
-    def calc_grav(self):
+    def _sweep(self, dx, dy):
+        """
+        Sweep the player's rect by (dx, dy) against the nearby platforms.
+        Returns the first contact as (time_of_impact, normal, platform_rect),
+        and the platform rects the player already overlaps.
+        """
+        with profiler.section('collision.platforms'):
+            nearby = [platform.rect for platform in self.level.platforms_colliding(swept_bounds(self.rect, dx, dy))]
+            embedded = [rect for rect in nearby if self.rect.colliderect(rect)]
+            return sweep_aabb(self.rect, dx, dy, nearby), embedded
+
+    def _land_or_bump(self, block, landing):
         """
-        Calculate the effect of gravity.
+        Stop vertical movement against a platform: on top of it when landing,
+        or under it when bumping into it from below.
         """
-        if self.change_y == 0:
-            self.change_y = 1
+        if landing:
+            self.rect.bottom = block.top
+            self.jump_count = 0
         else:
-            self.change_y += GRAVITY
+            self.rect.top = block.bottom
+        self.change_y = 0
+        self.subpixel_y = 0.0
+
+    def interpolated_rect(self, alpha):
+        """
+        Return where to draw the player, alpha of the way from the previous
+        tick's position to the current one.
+        """
+        rect = self.rect.copy()
+        rect.x = round(self.prev_rect.x + (self.rect.x - self.prev_rect.x) * alpha)
+        rect.y = round(self.prev_rect.y + (self.rect.y - self.prev_rect.y) * alpha)
+        return rect
 
     def jump(self):
         """
@@ -128,7 +233,7 @@ class Player(pygame.sprite.Sprite):
         """
         # Check if we are on the ground
         self.rect.y += 2
-        platform_hit_list = pygame.sprite.spritecollide(self, self.level.platform_list, False)
+        platform_hit_list = self.level.platforms_colliding(self.rect)
         self.rect.y -= 2
 
         # If it is ok to jump, set our speed upwards
@@ -160,65 +265,64 @@ class Player(pygame.sprite.Sprite):
         self.change_x = 0
         self.walking = False
 
-    def _animate(self):
-        """
-        Handles player animation.
-        """
-        now = pygame.time.get_ticks()
-
-        # Idle animation
-        if not self.walking:
-            if self.facing_right:
-                self.image = self.idle_image
-            else:
-                self.image = self.idle_image_left
-            return
-
-        # Walking animation
-        if now - self.last_update > self.animation_speed:
-            self.last_update = now
-            self.frame_index = (self.frame_index + 1) % len(self.walk_frames)
-            if self.facing_right:
-                self.image = self.walk_frames[self.frame_index]
-            else:
-                self.image = self.walk_frames_left[self.frame_index]
-
-        # Store the old center position
-        old_center = self.rect.center
-        # Update the rect with the new image
-        self.rect = self.image.get_rect()
-        # Set the new rect's center to the old center
-        self.rect.center = old_center
-
     def attack(self):
         """
         Perform an attack.
         """
         if not self.attacking:
             self.attacking = True
-            self.attack_time = pygame.time.get_ticks()
+            self.attack_time = self.time
             # Create a hitbox in front of the player
             if self.facing_right:
                 self.attack_rect = pygame.Rect(self.rect.right, self.rect.y, 60, self.rect.height)
             else:
                 self.attack_rect = pygame.Rect(self.rect.left - 60, self.rect.y, 60, self.rect.height)
 
-    def _handle_attack_timer(self):
+    def shoot(self):
+        """
+        Fire a projectile the way the player is facing, if the last shot
+        was long enough ago.
+        """
+        if self.time - self.last_shot < SHOOT_COOLDOWN:
+            return
+        self.last_shot = self.time
+        direction = 1 if self.facing_right else -1
+        self.level.projectiles.launch(PROJECTILE, self.rect.centerx + direction * self.rect.width / 2,
+                                      self.rect.centery, direction * PROJECTILE_KINDS[PROJECTILE]['speed'])
+
+    def snapshot(self):
         """
-        Handles the timer for the attack duration.
+        Return the player's progression and position as plain values, for
+        save games and checkpoints.
         """
-        if self.attacking:
-            now = pygame.time.get_ticks()
-            if now - self.attack_time > self.attack_duration:
-                self.attacking = False
-                self.attack_rect = pygame.Rect(0, 0, 0, 0)
+        snapshot = {name: getattr(self, name) for name in SAVED_STATS}
+        snapshot.update(x=self.rect.x, y=self.rect.y, change_y=self.change_y, jump_count=self.jump_count,
+                        facing_right=self.facing_right)
+        return snapshot
+
+    def restore(self, snapshot):
+        """
+        Put the player back in the state snapshot() recorded.
+        """
+        for name in SAVED_STATS:
+            setattr(self, name, snapshot[name])
+        self.rect.topleft = (snapshot['x'], snapshot['y'])
+        self.prev_rect = self.rect.copy()
+        self.change_x = 0
+        self.change_y = snapshot['change_y']
+        self.subpixel_x = self.subpixel_y = 0.0
+        self.jump_count = snapshot['jump_count']
+        self.facing_right = snapshot['facing_right']
+        self.attacking = False
+        self.attack_rect = pygame.Rect(0, 0, 0, 0)
 
     def add_xp(self, amount):
         """
         Add XP to the player and check for level up.
         """
         self.xp += amount
-        print(f"Player gained {amount} XP! Total XP: {self.xp}/{self.xp_to_next_level}")
+        if self.bus is not None:
+            self.bus.publish(XpGained(amount, self.xp, self.xp_to_next_level))
         self._check_level_up()
 
     def _check_level_up(self):
@@ -230,5 +334,5 @@ class Player(pygame.sprite.Sprite):
             self.xp -= self.xp_to_next_level
             self.xp_to_next_level = 100 * self.character_level
             self.available_stat_points += 5
-            print(f"Ding! You reached level {self.character_level}!")
-            print(f"You have {self.available_stat_points} stat points to spend.")
+            if self.bus is not None:
+                self.bus.publish(LevelUp(self.character_level, self.available_stat_points))
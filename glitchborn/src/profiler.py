@@ -0,0 +1,178 @@
+import csv
+import json
+import time
+import pygame
+from collections import deque
+
+# --- Constants ---
+PROFILE_HISTORY = 300 # Frames kept for averages and percentiles
+OVERLAY_COLOR = (255, 255, 0) # Yellow
+OVERLAY_BACKGROUND = (0, 0, 0, 160)
+OVERLAY_FONT_SIZE = 16
+
+class _Section:
+    """
+    Times one named phase; reused every frame so timing allocates nothing.
+    """
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        """
+        Initialize the timer for the phase name of profiler.
+        """
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        """
+        Start timing.
+        """
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        """
+        Add the time since __enter__ to the phase's total for this frame.
+        """
+        phases = self.profiler.phases
+        phases[self.name] = phases.get(self.name, 0.0) + (time.perf_counter() - self.start) * 1000
+
+class FrameProfiler:
+    """
+    Lightweight per-frame instrumentation. Hot paths wrap themselves in
+    `with profiler.section(name):` and report sprite counts with count();
+    the game brackets each frame with begin_frame()/end_frame(). Results can
+    be shown as an on-screen overlay or recorded as a per-frame trace.
+    """
+    def __init__(self, history=PROFILE_HISTORY):
+        """
+        Initialize the profiler with no recorded frames.
+        """
+        self.overlay_visible = False
+        self.frame = 0
+        # Milliseconds and counts for the frame in progress
+        self.phases = {}
+        self.counters = {}
+        # Recent frames, for the overlay
+        self.frame_times = deque(maxlen=history)
+        self.phase_history = deque(maxlen=history)
+        self.counter_history = deque(maxlen=history)
+        # Every frame since start_trace(), or None when not recording
+        self.trace = None
+        self._sections = {}
+        self._frame_start = 0.0
+
+    def section(self, name):
+        """
+        Return a context manager that adds the time spent inside it to the
+        named phase of the current frame.
+        """
+        section = self._sections.get(name)
+        if section is None:
+            section = self._sections[name] = _Section(self, name)
+        return section
+
+    def count(self, name, value):
+        """
+        Add value to a named counter for the current frame.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def begin_frame(self):
+        """
+        Start timing a new frame.
+        """
+        self.phases = {}
+        self.counters = {}
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """
+        Finish the current frame and store its timings.
+        """
+        frame_ms = (time.perf_counter() - self._frame_start) * 1000
+        self.frame_times.append(frame_ms)
+        self.phase_history.append(self.phases)
+        self.counter_history.append(self.counters)
+        if self.trace is not None:
+            row = {'frame': self.frame, 'frame_ms': round(frame_ms, 3)}
+            row.update((name, round(ms, 3)) for name, ms in self.phases.items())
+            row.update(self.counters)
+            self.trace.append(row)
+        self.frame += 1
+
+    def percentile(self, pct):
+        """
+        Return the given percentile of recent frame times, in milliseconds.
+        """
+        if not self.frame_times:
+            return 0.0
+        times = sorted(self.frame_times)
+        return times[min(len(times) - 1, int(len(times) * pct / 100))]
+
+    def averages(self, history):
+        """
+        Return the mean of each named value over the recent frames.
+        """
+        totals = {}
+        for frame in history:
+            for name, value in frame.items():
+                totals[name] = totals.get(name, 0) + value
+        frames = max(len(history), 1)
+        return {name: total / frames for name, total in totals.items()}
+
+    def start_trace(self):
+        """
+        Start recording every frame for dump_trace().
+        """
+        self.trace = []
+
+    def dump_trace(self, path):
+        """
+        Write the recorded trace to path, as JSON if it ends in .json and as
+        CSV otherwise, and stop recording.
+        """
+        rows = self.trace or []
+        self.trace = None
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump(rows, f)
+            return
+        columns = []
+        for row in rows:
+            columns.extend(name for name in row if name not in columns)
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def overlay_lines(self, fps):
+        """
+        Return the text lines shown by the overlay.
+        """
+        lines = [
+            f"FPS: {fps:.0f}",
+            f"frame ms p50/p95/p99: {self.percentile(50):.2f} / {self.percentile(95):.2f} / {self.percentile(99):.2f}",
+        ]
+        for name, ms in sorted(self.averages(self.phase_history).items()):
+            lines.append(f"{name}: {ms:.2f} ms")
+        for name, value in sorted(self.averages(self.counter_history).items()):
+            lines.append(f"{name}: {value:.0f}")
+        return lines
+
+    def draw_overlay(self, screen, font, fps):
+        """
+        Draw the overlay in the top-left corner of the screen and return
+        the rect it covers.
+        """
+        surfaces = [font.render(line, True, OVERLAY_COLOR) for line in self.overlay_lines(fps)]
+        line_height = font.get_linesize()
+        width = max(surface.get_width() for surface in surfaces) + 10
+        background = pygame.Surface((width, line_height * len(surfaces) + 10), pygame.SRCALPHA)
+        background.fill(OVERLAY_BACKGROUND)
+        rect = screen.blit(background, (0, 0))
+        screen.blits([(surface, (5, 5 + i * line_height)) for i, surface in enumerate(surfaces)], False)
+        return rect
+
+# Shared by the game loop and every instrumented hot path
+profiler = FrameProfiler()
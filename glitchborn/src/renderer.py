@@ -0,0 +1,78 @@
+import pygame
+
+class DirtyRectRenderer:
+    """
+    Optional renderer that only repaints what changed. While the view holds
+    still, everything static (background, platforms, an open menu) is kept
+    in a cached surface; each frame only the areas covered by moving things
+    last frame and this frame are restored and redrawn, and only those
+    areas are pushed to the display. While the view changes (scrolling,
+    opening a menu) it falls back to full redraws.
+    """
+    def __init__(self, screen, headless=False):
+        """
+        Initialize the renderer for a display surface.
+        """
+        self.screen = screen
+        self.headless = headless
+        self.background = pygame.Surface(screen.get_size())
+        self.background_valid = False
+        self.view_key = None
+        # Screen rects the dynamic layer drew last frame
+        self.dirty = []
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        """
+        Force the next frame to rebuild the static layer, e.g. after a menu's
+        contents change.
+        """
+        self.background_valid = False
+
+    def _present(self, rects=None):
+        """
+        Push the frame to the display, either whole or just the given rects.
+        """
+        if rects is None:
+            self.full_frames += 1
+            if not self.headless:
+                pygame.display.flip()
+        else:
+            self.partial_frames += 1
+            if not self.headless and rects:
+                pygame.display.update(rects)
+
+    def render(self, view_key, draw_static, draw_dynamic):
+        """
+        Draw a frame. view_key identifies what the static layer looks like
+        (e.g. the camera position and game state); draw_static(surface) paints
+        the static layer and draw_dynamic(surface) paints everything else and
+        returns the rects it touched.
+        """
+        screen = self.screen
+        if view_key != self.view_key:
+            # The view is changing, so a cached static layer would be stale by
+            # the next frame anyway: draw everything straight to the screen
+            self.view_key = view_key
+            self.background_valid = False
+            draw_static(screen)
+            self.dirty = draw_dynamic(screen)
+            self._present()
+            return
+
+        if not self.background_valid:
+            # The view has come to rest: cache the static layer once
+            draw_static(self.background)
+            self.background_valid = True
+            screen.blit(self.background, (0, 0))
+            self.dirty = draw_dynamic(screen)
+            self._present()
+            return
+
+        # Restore last frame's dynamic areas, then draw this frame's on top
+        previous = self.dirty
+        for rect in previous:
+            screen.blit(self.background, rect, rect)
+        self.dirty = draw_dynamic(screen)
+        self._present(previous + self.dirty)
@@ -0,0 +1,138 @@
+"""
+Record and replay game sessions.
+
+Every change to the simulation comes from the seed and the per-tick
+InputState, so a session is stored as its starting conditions plus one
+input mask per tick. Masks are run-length encoded, as holding a direction
+for seconds at a time makes long runs of identical ticks the norm:
+
+    header   magic b"GBRP", version, length of the JSON start conditions
+    start    JSON: seed, tick rate, level file, starting snapshot
+    runs     run count, then (ticks, mask) pairs as unsigned 16-bit ints
+
+Run this module on a recording to replay it headless and as fast as the
+CPU allows, e.g. to reproduce a performance problem or soak-test a long
+session:
+
+    python replay.py session.gbrp --render --trace replay_trace.csv
+"""
+import argparse
+import array
+import hashlib
+import json
+import struct
+import sys
+import time
+from controls import ReplayInput
+
+# --- Constants ---
+MAGIC = b"GBRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxI") # magic, version, start conditions length
+RUN_COUNT = struct.Struct("<I")
+MAX_RUN = 0xFFFF # Longest run one pair can hold
+
+class ReplayFormatError(ValueError):
+    """
+    Raised when a file is not a recording this version can read.
+    """
+
+def encode_runs(masks):
+    """
+    Run-length encode input masks into an array of (ticks, mask) pairs.
+    """
+    runs = array.array('H')
+    for mask in masks:
+        if runs and runs[-1] == mask and runs[-2] < MAX_RUN:
+            runs[-2] += 1
+        else:
+            runs.extend((1, mask))
+    return runs
+
+def decode_runs(runs):
+    """
+    Expand (ticks, mask) pairs back into one mask per tick.
+    """
+    masks = []
+    for i in range(0, len(runs), 2):
+        masks.extend([runs[i + 1]] * runs[i])
+    return masks
+
+def write_replay(path, start, masks):
+    """
+    Write a recording: start is a dict of the starting conditions (seed,
+    tick_rate, level_path, snapshot) and masks one input mask per tick.
+    """
+    start_data = json.dumps(start, separators=(',', ':')).encode()
+    runs = encode_runs(masks)
+    if sys.byteorder != 'little':
+        runs.byteswap()
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(start_data)))
+        f.write(start_data)
+        f.write(RUN_COUNT.pack(len(runs) // 2))
+        runs.tofile(f)
+
+def read_replay(path):
+    """
+    Read a recording and return (start conditions, input masks).
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ReplayFormatError(f"{path} is too short to be a recording")
+    magic, version, start_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ReplayFormatError(f"{path} is not a version {VERSION} recording")
+    offset = HEADER.size
+    start = json.loads(data[offset:offset + start_length])
+    offset += start_length
+    (run_count,) = RUN_COUNT.unpack_from(data, offset)
+    offset += RUN_COUNT.size
+    runs = array.array('H')
+    runs.frombytes(data[offset:offset + run_count * 4])
+    if sys.byteorder != 'little':
+        runs.byteswap()
+    return start, decode_runs(runs)
+
+def state_digest(game):
+    """
+    Return a short hash of the game's state, to check that two runs of a
+    recording ended up in exactly the same place.
+    """
+    return hashlib.sha1(json.dumps(game.snapshot(), sort_keys=True).encode()).hexdigest()[:12]
+
+def replay_game(path, **kwargs):
+    """
+    Create a game that plays back a recording. Other keyword arguments are
+    passed on to Game, e.g. headless or trace_path.
+    """
+    from main import Game # main imports this module to record sessions
+    start, masks = read_replay(path)
+    return Game(seed=start['seed'], tick_rate=start['tick_rate'], level_path=start['level_path'],
+                start=start['snapshot'], input_source=ReplayInput(masks), **kwargs)
+
+def main():
+    """
+    Replay a recording headless, as fast as possible, and report the speed
+    and the final state.
+    """
+    parser = argparse.ArgumentParser(description="Replay a recorded Glitchborn session")
+    parser.add_argument('path', help="recording to replay")
+    parser.add_argument('--render', action='store_true', help="draw every tick, to replay rendering costs too")
+    parser.add_argument('--trace', help="write a per-tick profiling trace to this .csv or .json file")
+    parser.add_argument('--loops', type=int, default=1, help="play the recording this many times, for soak tests")
+    args = parser.parse_args()
+
+    for loop in range(args.loops):
+        game = replay_game(args.path, headless=True, trace_path=args.trace)
+        ticks = len(game.input.masks)
+        start = time.perf_counter()
+        game.simulate(ticks, render=args.render)
+        elapsed = time.perf_counter() - start
+        rate = ticks / elapsed if elapsed > 0 else float('inf')
+        print(f"loop {loop + 1}: {ticks} ticks in {elapsed:.2f}s ({rate:.0f} ticks/s), state {state_digest(game)}")
+        game.quit()
+
+if __name__ == '__main__':
+    main()
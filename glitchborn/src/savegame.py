@@ -0,0 +1,215 @@
+"""
+Save games.
+
+A snapshot is a nested dict of plain values, as returned by
+Player.snapshot() and Level.snapshot(). It is stored flattened into dotted
+keys ("player.xp"), so consecutive saves can be written as deltas holding
+just the keys that changed. A save file is a short header followed by
+records:
+
+    header   magic b"GBSV"
+    record   kind (b"F" for a full snapshot, b"D" for a delta), payload
+             length, then the zlib-compressed JSON payload
+
+Reading replays the last full record and the deltas after it. After
+MAX_DELTAS deltas the file is rewritten as a single full record.
+"""
+import json
+import os
+import struct
+import threading
+import zlib
+from events import SaveFailed
+
+# --- Constants ---
+MAGIC = b"GBSV"
+RECORD = struct.Struct("<cI") # kind, payload length
+FULL = b"F"
+DELTA = b"D"
+MAX_DELTAS = 50 # Deltas appended before the file is compacted
+_MISSING = object()
+
+class SaveFormatError(ValueError):
+    """
+    Raised when a file is not a save file this version can read.
+    """
+
+def flatten(snapshot, prefix=""):
+    """
+    Flatten a nested snapshot into a dict of dotted keys. Empty dicts are
+    kept as values, since they have no keys to carry them.
+    """
+    flat = {}
+    for key, value in snapshot.items():
+        if isinstance(value, dict) and value:
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def unflatten(flat):
+    """
+    Rebuild a nested snapshot from dotted keys.
+    """
+    snapshot = {}
+    for key, value in flat.items():
+        *parents, name = key.split(".")
+        node = snapshot
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[name] = value
+    return snapshot
+
+def diff(old, new):
+    """
+    Return the delta that turns the flat snapshot old into new.
+    """
+    changed = {key: value for key, value in new.items() if old.get(key, _MISSING) != value}
+    removed = [key for key in old if key not in new]
+    return {'set': changed, 'unset': removed}
+
+def apply_delta(flat, delta):
+    """
+    Apply a delta from diff() to a flat snapshot in place.
+    """
+    flat.update(delta['set'])
+    for key in delta['unset']:
+        flat.pop(key, None)
+
+def _record(kind, payload):
+    """
+    Encode one record.
+    """
+    data = zlib.compress(json.dumps(payload, separators=(',', ':')).encode())
+    return RECORD.pack(kind, len(data)) + data
+
+def read_save(path):
+    """
+    Read a save file and return the latest snapshot in it.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise SaveFormatError(f"{path} is not a save file")
+    flat = None
+    offset = len(MAGIC)
+    while offset + RECORD.size <= len(data):
+        kind, length = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if offset + length > len(data):
+            break # A record cut short by a crash mid-write; keep what came before
+        payload = json.loads(zlib.decompress(data[offset:offset + length]))
+        offset += length
+        if kind == FULL:
+            flat = payload
+        elif kind == DELTA and flat is not None:
+            apply_delta(flat, payload)
+    if flat is None:
+        raise SaveFormatError(f"{path} holds no snapshot")
+    return unflatten(flat)
+
+class SaveFile:
+    """
+    Writes snapshots to one save file, appending a delta against the
+    previous snapshot when possible.
+    """
+    def __init__(self, path):
+        """
+        Initialize the writer. The file is rewritten by the first save.
+        """
+        self.path = path
+        self.state = None # Flat copy of what the file currently holds
+        self.deltas = 0
+
+    def write(self, snapshot):
+        """
+        Save a snapshot. Returns the number of bytes written.
+        """
+        flat = flatten(snapshot)
+        if self.state is None or self.deltas >= MAX_DELTAS:
+            # Write a fresh file next to the old one and swap it in, so a
+            # crash never leaves a half-written save behind
+            data = MAGIC + _record(FULL, flat)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.deltas = 0
+        else:
+            delta = diff(self.state, flat)
+            if not delta['set'] and not delta['unset']:
+                return 0
+            data = _record(DELTA, delta)
+            with open(self.path, 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self.deltas += 1
+        self.state = flat
+        return len(data)
+
+class Autosaver:
+    """
+    Saves snapshots on a background thread, so writing to disk never holds
+    up a frame. The game only takes the snapshot (a few small dicts) and
+    hands it over; if saves arrive faster than the disk keeps up, only the
+    newest pending one is written.
+
+    A save that fails is kept in error and, if a log was given (a LogSink,
+    which may be called from any thread), reported to it as a SaveFailed.
+    """
+    def __init__(self, path, log=None):
+        """
+        Initialize the autosaver and start its thread.
+        """
+        self.save_file = SaveFile(path)
+        self.log = log
+        self.saves = 0
+        self.error = None # The last error from writing, if any
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = None
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot):
+        """
+        Queue a snapshot to be written, replacing any that is still waiting.
+        """
+        with self._lock:
+            self._pending = snapshot
+        self._wake.set()
+
+    def _run(self):
+        """
+        Write the newest pending snapshot each time one is submitted, until
+        close() is called; a snapshot still pending then is written first.
+        """
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                snapshot, self._pending = self._pending, None
+                closing = self._closing
+            if snapshot is not None:
+                try:
+                    self.save_file.write(snapshot)
+                    self.saves += 1
+                except OSError as e:
+                    self.error = e
+                    if self.log is not None:
+                        self.log(SaveFailed(str(e)))
+            if closing:
+                return
+
+    def close(self):
+        """
+        Write any pending snapshot and stop the thread.
+        """
+        with self._lock:
+            self._closing = True
+        self._wake.set()
+        self._thread.join()
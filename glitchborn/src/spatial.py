@@ -0,0 +1,92 @@
+# --- Constants ---
+DEFAULT_CELL_SIZE = 128
+
+class SpatialGrid:
+    """
+    A uniform grid broadphase. Items are bucketed by every cell their rect
+    overlaps, so a query only has to look at the handful of cells around the
+    query rect instead of every item in the level.
+    """
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        """
+        Initialize an empty grid.
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        self.item_cells = {}
+
+    def cell_span(self, rect):
+        """
+        Return the (left, top, right, bottom) cell coordinates a rect
+        overlaps, inclusive.
+        """
+        size = self.cell_size
+        left = rect.left // size
+        right = (rect.left + max(rect.width, 1) - 1) // size
+        top = rect.top // size
+        bottom = (rect.top + max(rect.height, 1) - 1) // size
+        return left, top, right, bottom
+
+    def _cells_for(self, rect):
+        """
+        Return the list of cell keys a rect overlaps.
+        """
+        left, top, right, bottom = self.cell_span(rect)
+        return [(cx, cy) for cx in range(left, right + 1) for cy in range(top, bottom + 1)]
+
+    def insert(self, item, rect=None):
+        """
+        Add an item to the grid. Uses the item's own rect unless one is given.
+        """
+        if item in self.item_cells:
+            self.remove(item)
+        keys = self._cells_for(rect if rect is not None else item.rect)
+        for key in keys:
+            self.cells.setdefault(key, []).append(item)
+        self.item_cells[item] = keys
+
+    def remove(self, item):
+        """
+        Remove an item from the grid. Removing an unknown item is a no-op.
+        """
+        keys = self.item_cells.pop(item, None)
+        if keys is None:
+            return
+        for key in keys:
+            bucket = self.cells[key]
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[key]
+
+    def query(self, rect):
+        """
+        Return the items in the cells overlapped by rect, without duplicates.
+        This is a broadphase: callers still do the exact overlap test.
+        """
+        found = {}
+        cells = self.cells
+        for key in self._cells_for(rect):
+            bucket = cells.get(key)
+            if bucket:
+                for item in bucket:
+                    found[item] = None
+        return list(found)
+
+    def clear(self):
+        """
+        Remove every item from the grid.
+        """
+        self.cells.clear()
+        self.item_cells.clear()
+
+    def __len__(self):
+        """
+        The number of items in the grid.
+        """
+        return len(self.item_cells)
+
+    def __contains__(self, item):
+        """
+        Return whether item is in the grid.
+        """
+        return item in self.item_cells
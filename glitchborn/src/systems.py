@@ -0,0 +1,144 @@
+import numpy as np
+import pygame
+
+# Systems run on a World once per simulation tick, in the order the level
+# adds them. Each one processes every entity with the components it needs
+# in a single batch; only collision against the level still goes entity by
+# entity, since it needs a spatial query per body. Speeds and accelerations
+# are per TICK_MS tick, so systems scale them by world.tick_scale.
+
+def history_system(world):
+    """
+    Remember where every interpolated entity is before this tick moves it.
+    """
+    entities = world.query('position', 'previous')
+    for field in ('x', 'y'):
+        world.columns['previous'][field][entities] = world.columns['position'][field][entities]
+
+def attack_system(world):
+    """
+    End every attack that has lasted longer than its duration.
+    """
+    entities = world.query('attack')
+    attack = world.columns['attack']
+    expired = entities[attack['active'][entities]
+                       & (world.time - attack['start'][entities] > attack['duration'][entities])]
+    attack['active'][expired] = False
+    for entity in expired:
+        world.objects[entity].attack_rect = pygame.Rect(0, 0, 0, 0)
+
+def gravity_system(world):
+    """
+    Accelerate everything affected by gravity downwards. A body that is
+    resting (no vertical speed) gets a small push so it keeps testing the
+    ground beneath it.
+    """
+    entities = world.query('velocity', 'gravity')
+    dy = world.columns['velocity']['dy']
+    falling = dy[entities]
+    strength = world.columns['gravity']['strength'][entities] * world.tick_scale
+    dy[entities] = np.where(falling == 0, 1, falling + strength)
+
+def movement_system(world):
+    """
+    Move everything with a velocity. Free movers are integrated in one step;
+    bodies move through their object's move(), which resolves collisions
+    against the level, and their position is read back from its rect.
+    """
+    position = world.columns['position']
+    velocity = world.columns['velocity']
+    entities = world.query('position', 'velocity', exclude=('body',))
+    position['x'][entities] += velocity['dx'][entities] * world.tick_scale
+    position['y'][entities] += velocity['dy'][entities] * world.tick_scale
+
+    for entity in world.query('position', 'body'):
+        obj = world.objects[entity]
+        obj.move()
+        position['x'][entity] = obj.rect.x
+        position['y'][entity] = obj.rect.y
+
+def patrol_system(world):
+    """
+    Walk every patroller back and forth between its patrol bounds.
+    """
+    entities = world.query('position', 'patrol')
+    patrol = world.columns['patrol']
+    min_x = patrol['min_x'][entities]
+    max_x = patrol['max_x'][entities]
+    direction = patrol['direction'][entities]
+    x = world.columns['position']['x'][entities] + patrol['speed'][entities] * world.tick_scale * direction
+
+    # Turn around at the edges of the patrol range, snapping back onto the
+    # edge to prevent overshooting
+    direction[x > max_x] = -1
+    direction[x < min_x] = 1
+    np.clip(x, min_x, max_x, out=x)
+    world.columns['position']['x'][entities] = x
+    patrol['direction'][entities] = direction
+
+def chase_system(world):
+    """
+    Move every chasing enemy one step along its path to the player. Paths
+    come from the level's navigation graph, so this is one cached lookup
+    and a little arithmetic per chaser.
+    """
+    for entity in world.query('position', 'chase'):
+        world.objects[entity].chase_step()
+
+def index_system(world, grid):
+    """
+    Keep grid up to date with the entities' current positions. The cell
+    span of every indexed entity is recomputed in one step, and only the
+    few that crossed into different cells since the last call are
+    re-bucketed.
+    """
+    entities = world.query('position', 'size', 'indexed')
+    position = world.columns['position']
+    size = world.columns['size']
+    indexed = world.columns['indexed']
+    cell_size = grid.cell_size
+    x = position['x'][entities].astype(np.int64)
+    y = position['y'][entities].astype(np.int64)
+    w = np.maximum(size['w'][entities], 1)
+    h = np.maximum(size['h'][entities], 1)
+    span = {
+        'left': x // cell_size,
+        'top': y // cell_size,
+        'right': (x + w - 1) // cell_size,
+        'bottom': (y + h - 1) // cell_size,
+    }
+    changed = np.zeros(len(entities), dtype=bool)
+    for field, cells in span.items():
+        changed |= cells != indexed[field][entities]
+    if not changed.any():
+        return
+
+    for field, cells in span.items():
+        indexed[field][entities[changed]] = cells[changed]
+    for i in np.flatnonzero(changed):
+        rect = pygame.Rect(int(x[i]), int(y[i]), int(size['w'][entities[i]]), int(size['h'][entities[i]]))
+        grid.insert(world.objects[entities[i]], rect)
+
+def render_system(world, screen, camera, view, alpha=1.0):
+    """
+    Draw every sprite entity overlapping view (a world-space rect) and
+    return the screen rects that were drawn to. Entities with a previous
+    position are drawn alpha of the way from it to their position. Culling
+    is one vectorized test over all of them.
+    """
+    entities = world.query('sprite', 'position', 'size')
+    position = world.columns['position']
+    previous = world.columns['previous']
+    size = world.columns['size']
+    x = position['x'][entities]
+    y = position['y'][entities]
+    moving = world.masks['previous'][entities]
+    x = np.where(moving, x - (x - previous['x'][entities]) * (1 - alpha), x)
+    y = np.where(moving, y - (y - previous['y'][entities]) * (1 - alpha), y)
+    visible = ((x + size['w'][entities] > view.left) & (x < view.right)
+               & (y + size['h'][entities] > view.top) & (y < view.bottom))
+    offset = round(camera.draw_x)
+    objects = world.objects
+    blits = [(objects[entity].image, (int(sx) - offset, int(sy)))
+             for entity, sx, sy in zip(entities[visible], x[visible], y[visible])]
+    return screen.blits(blits, True)
@@ -0,0 +1,21 @@
+"""
+Test setup for pytest. The game's modules import each other by bare name
+from glitchborn/src, and its platform module shares its name with the
+standard library's, which pytest has already imported by the time tests
+are collected. level (the only importer of the game's platform) is
+imported here with the game's module in its place, then the standard
+library's is put back for everything else.
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, os.path.normpath(SRC))
+
+_stdlib_platform = sys.modules.pop('platform', None)
+try:
+    import level # noqa: F401
+finally:
+    if _stdlib_platform is not None:
+        sys.modules['platform'] = _stdlib_platform
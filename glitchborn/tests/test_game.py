@@ -0,0 +1,52 @@
+"""
+Whole-game behaviour, driven headless. Run with pytest from the
+repository root, or with unittest from glitchborn/src:
+
+    python -m pytest glitchborn/tests
+    python -m unittest discover -s ../tests
+"""
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from main import Game
+from player import SHOOT_COOLDOWN
+
+class LevelTransitionTest(unittest.TestCase):
+    """
+    Moving on to the next level keeps the player's timers working.
+    """
+    def setUp(self):
+        """
+        Start a headless game.
+        """
+        with redirect_stdout(io.StringIO()):
+            self.game = Game(headless=True, seed=1)
+
+    def tearDown(self):
+        """
+        Shut the game down.
+        """
+        with redirect_stdout(io.StringIO()):
+            self.game.quit()
+
+    def test_shoot_after_advance_level(self):
+        """
+        A shot fired late in one level doesn't stop the player shooting
+        once the cooldown has passed in the next.
+        """
+        game = self.game
+        game.simulate(600)
+        game.player.shoot()
+        game.simulate(round(SHOOT_COOLDOWN / game.tick_ms) + 1)
+        game.advance_level()
+        game.player.shoot()
+        self.assertEqual(len(game.level.projectiles), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Level files: damaged files are rejected, and open files are closed. Run
+with pytest from the repository root, or with unittest from glitchborn/src:
+
+    python -m pytest glitchborn/tests
+    python -m unittest discover -s ../tests
+"""
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pygame
+from level import Level
+from level_format import LevelFile, LevelFormatError
+from main import Game
+
+class LevelFileTest(unittest.TestCase):
+    """
+    Reading and closing level files.
+    """
+    def setUp(self):
+        """
+        Open a display for the sprites and save a level to a scratch file.
+        """
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "level.gblv")
+        Level(seed=1).save(self.path)
+
+    def tearDown(self):
+        """
+        Remove the scratch file.
+        """
+        self.directory.cleanup()
+
+    def test_truncated_chunk(self):
+        """
+        A chunk whose records were cut off raises LevelFormatError.
+        """
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+        with LevelFile(self.path) as source:
+            source.read_chunk(0)
+            with self.assertRaises(LevelFormatError):
+                source.read_chunk(source.chunk_count - 1)
+
+    def test_advance_level_closes_file(self):
+        """
+        Moving on from a level loaded from a file closes the file.
+        """
+        with redirect_stdout(io.StringIO()):
+            game = Game(headless=True, seed=1, level_path=self.path)
+            source = game.level.source
+            try:
+                game.advance_level()
+                self.assertTrue(source._map.closed)
+            finally:
+                game.quit()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Platform navigation and chasing enemies. Run with pytest from the
+repository root, or with unittest from glitchborn/src:
+
+    python -m pytest glitchborn/tests
+    python -m unittest discover -s ../tests
+"""
+import heapq
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pygame
+from batch import RunnerPolicy
+from level import Level
+from main import Game
+
+# --- Constants ---
+SEEDS = (0, 3)
+TICKS = 900
+PATH_SEEDS = range(8)
+CAMERA_XS = (0, 8000, 20000) # Where the graph is taken from: over the ground and past it
+
+def dijkstra(nav, start):
+    """
+    Return the cheapest cost from start to every node nav can reach.
+    """
+    costs = {start: 0}
+    frontier = [(0, 0, start)]
+    counter = 1
+    while frontier:
+        cost, _, node = heapq.heappop(frontier)
+        if cost > costs[node]:
+            continue
+        for edge in nav.edges[node]:
+            if cost + edge.ticks < costs.get(edge.target, float('inf')):
+                costs[edge.target] = cost + edge.ticks
+                heapq.heappush(frontier, (cost + edge.ticks, counter, edge.target))
+                counter += 1
+    return costs
+
+class PathTest(unittest.TestCase):
+    """
+    The navigation graph finds the cheapest paths.
+    """
+    def setUp(self):
+        """
+        Open a display for the sprites.
+        """
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+
+    def test_paths_match_dijkstra(self):
+        """
+        Every path A* finds between two platforms of a generated level costs
+        the same as the cheapest one Dijkstra's algorithm finds.
+        """
+        for seed in PATH_SEEDS:
+            level = Level(seed=seed)
+            for camera_x in CAMERA_XS:
+                level.camera.x = camera_x
+                level.stream()
+                nav = level.nav
+                for start in nav.nodes:
+                    costs = dijkstra(nav, start)
+                    for goal in nav.nodes:
+                        path = nav.path(start, goal)
+                        if goal not in costs:
+                            self.assertIsNone(path)
+                        else:
+                            self.assertEqual(sum(edge.ticks for edge in path), costs[goal],
+                                             f"seed {seed}, {start} to {goal}")
+
+class ChaseTest(unittest.TestCase):
+    """
+    Chasers stay on their platforms between jumps.
+    """
+    def test_chasers_stay_on_their_platform(self):
+        """
+        A chaser that isn't in the middle of a jump is always within the
+        extent of the platform it is on.
+        """
+        checked = 0
+        for seed in SEEDS:
+            with redirect_stdout(io.StringIO()):
+                policy = RunnerPolicy(seed)
+                game = Game(headless=True, seed=seed, input_source=policy)
+                policy.bind(game)
+                try:
+                    for tick in range(TICKS):
+                        game.simulate(1)
+                        level = game.level
+                        world = level.world
+                        for entity in world.query('chase'):
+                            enemy = world.objects[entity]
+                            if enemy.chase_edge is not None:
+                                continue
+                            left, _, width, _ = level.nav.nodes[enemy.chase_node]
+                            x = world.columns['position']['x'][entity]
+                            self.assertGreaterEqual(x, left, f"seed {seed}, tick {tick}")
+                            self.assertLessEqual(x + enemy.rect.width, left + width, f"seed {seed}, tick {tick}")
+                            checked += 1
+                finally:
+                    game.quit()
+        self.assertGreater(checked, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Save game round trips and checkpoint restores. Run with pytest from the
+repository root, or with unittest from glitchborn/src:
+
+    python -m pytest glitchborn/tests
+    python -m unittest discover -s ../tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pygame
+from events import SaveFailed
+from level import Level
+from savegame import Autosaver, SaveFile, read_save
+
+class SaveRoundTripTest(unittest.TestCase):
+    """
+    A level snapshot written to a save file comes back as the same level.
+    """
+    def setUp(self):
+        """
+        Open a display for the sprites and make a scratch save path.
+        """
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "save.gbsv")
+
+    def tearDown(self):
+        """
+        Remove the scratch save.
+        """
+        self.directory.cleanup()
+
+    def round_trip(self, level):
+        """
+        Write level's snapshot, read it back and build a level from it.
+        """
+        SaveFile(self.path).write({'level': level.snapshot()})
+        return Level.from_snapshot(read_save(self.path)['level'])
+
+    def test_no_kills(self):
+        """
+        A save from before the first kill restores with nothing killed.
+        """
+        level = Level(seed=1)
+        restored = self.round_trip(level)
+        self.assertEqual(restored.killed_enemies, set())
+        self.assertEqual(len(restored.enemy_list), len(level.enemy_list))
+
+    def test_kills(self):
+        """
+        Killed enemies stay killed after a restore.
+        """
+        level = Level(seed=1)
+        enemy = next(iter(level.enemy_list))
+        level.kill_enemy(enemy)
+        restored = self.round_trip(level)
+        self.assertEqual(restored.killed_enemies, {enemy.spawn_id})
+        self.assertNotIn(enemy.spawn_id, {other.spawn_id for other in restored.enemy_list})
+
+    def test_delta_to_no_kills(self):
+        """
+        A delta that brings every killed enemy back restores with nothing
+        killed.
+        """
+        level = Level(seed=1)
+        snapshot = level.snapshot()
+        save_file = SaveFile(self.path)
+        level.kill_enemy(next(iter(level.enemy_list)))
+        save_file.write({'level': level.snapshot()})
+        save_file.write({'level': snapshot})
+        restored = Level.from_snapshot(read_save(self.path)['level'])
+        self.assertEqual(restored.killed_enemies, set())
+
+class CheckpointTest(unittest.TestCase):
+    """
+    Restoring a level in place brings back what was defeated since.
+    """
+    def setUp(self):
+        """
+        Open a display for the sprites.
+        """
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+
+    def test_restore_after_eviction(self):
+        """
+        An enemy killed after the snapshot comes back even if its chunk was
+        evicted and rebuilt in between.
+        """
+        level = Level(seed=1)
+        snapshot = level.snapshot()
+        enemy = min(level.enemy_list, key=lambda enemy: enemy.spawn_id)
+        level.kill_enemy(enemy)
+        level.camera.x = 12000
+        level.stream()
+        self.assertNotIn(enemy.spawn_id[0], level.chunks)
+        level.camera.x = 0
+        level.stream()
+        level.restore(snapshot)
+        self.assertIn(enemy.spawn_id, {other.spawn_id for other in level.enemy_list})
+
+class AutosaverTest(unittest.TestCase):
+    """
+    A failed background save is kept and reported.
+    """
+    def test_failed_save(self):
+        """
+        A save that cannot be written leaves its error on the autosaver and
+        sends a SaveFailed to the log.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            log = []
+            autosaver = Autosaver(os.path.join(directory, "missing", "save.gbsv"), log.append)
+            autosaver.submit({'level': {}})
+            autosaver.close()
+        self.assertIsInstance(autosaver.error, OSError)
+        self.assertEqual(autosaver.saves, 0)
+        self.assertEqual([type(event) for event in log], [SaveFailed])
+
+if __name__ == '__main__':
+    unittest.main()